@@ -5,19 +5,63 @@ from flask_mail import Mail
 import os
 from dotenv import load_dotenv
 
+# Before the imports below: metrics read PROMETHEUS_MULTIPROC_DIR when they are created
 load_dotenv()
 
+from app.utils.view_counter import ViewCounter
+from app.utils.response_cache import ResponseCache
+from app.utils.perf import PerfMonitor
+from app.utils.nplusone import NPlusOneDetector
+from app.utils.metrics import Metrics
+from app.utils.outbox import EmailOutbox
+from app.utils.smtp_pool import SMTPPool
+from app.utils.otp_hash import OTPHasher
+from app.utils.otp_store import create_otp_store
+
 db = SQLAlchemy()
 login_manager = LoginManager()
 mail = Mail()
+view_counter = ViewCounter()
+response_cache = ResponseCache()
+perf_monitor = PerfMonitor()
+nplusone_detector = NPlusOneDetector()
+metrics = Metrics()
+email_outbox = EmailOutbox()
+smtp_pool = SMTPPool()
+otp_hasher = OTPHasher()
 
 def get_database_uri():
     return os.getenv('DATABASE_URL', 'sqlite:///prompts.db')
 
 def configure_app(app):
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.config['OTP_SECRET'] = os.getenv('OTP_SECRET')
+    app.config['OTP_HASHER'] = os.getenv('OTP_HASHER', 'hmac')
+    app.config['OTP_STORE'] = os.getenv('OTP_STORE', 'sql')
+    app.config['OTP_STORE_URL'] = os.getenv('OTP_STORE_URL', 'redis://localhost:6379/0')
+    app.config['BUILD_ID'] = os.getenv('BUILD_ID')
     app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri()
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SEARCH_ENGINE'] = os.getenv('SEARCH_ENGINE', 'database')
+    app.config['SEARCH_MAX_RESULTS'] = int(os.getenv('SEARCH_MAX_RESULTS', 1000))
+    app.config['FILTER_INDEX'] = os.getenv('FILTER_INDEX', 'False') == 'True'
+    app.config['MARKDOWN_CACHE_BYTES'] = int(os.getenv('MARKDOWN_CACHE_BYTES', 16 * 1024 * 1024))
+    app.config['VIEW_FLUSH_INTERVAL'] = float(os.getenv('VIEW_FLUSH_INTERVAL', 10))
+    app.config['VIEW_FLUSH_THRESHOLD'] = int(os.getenv('VIEW_FLUSH_THRESHOLD', 100))
+    
+    app.config['RESPONSE_CACHE_BACKEND'] = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+    app.config['RESPONSE_CACHE_BYTES'] = int(os.getenv('RESPONSE_CACHE_BYTES', 32 * 1024 * 1024))
+    app.config['RESPONSE_CACHE_PATH'] = os.getenv('RESPONSE_CACHE_PATH')
+    app.config['RESPONSE_CACHE_URL'] = os.getenv('RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+    
+    app.config['PERF_MONITOR'] = os.getenv('PERF_MONITOR', 'True') == 'True'
+    app.config['PERF_BUFFER_SIZE'] = int(os.getenv('PERF_BUFFER_SIZE', 1000))
+    app.config['NPLUSONE_DETECT'] = os.getenv('NPLUSONE_DETECT', 'False') == 'True'
+    app.config['NPLUSONE_THRESHOLD'] = int(os.getenv('NPLUSONE_THRESHOLD', 5))
+    app.config['NPLUSONE_RAISE'] = os.getenv('NPLUSONE_RAISE', 'False') == 'True'
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'False') == 'True'
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
     
     app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
     app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
@@ -28,12 +72,28 @@ def configure_app(app):
     app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@promptkhajana.com')
     app.config['MAIL_DEBUG'] = False
     app.config['MAIL_SUPPRESS_SEND'] = False
+    app.config['MAIL_POOL_SIZE'] = int(os.getenv('MAIL_POOL_SIZE', 2))
+    app.config['MAIL_POOL_IDLE_TIMEOUT'] = float(os.getenv('MAIL_POOL_IDLE_TIMEOUT', 60))
+    
+    app.config['EMAIL_OUTBOX_WORKERS'] = int(os.getenv('EMAIL_OUTBOX_WORKERS', 2))
+    app.config['EMAIL_MAX_ATTEMPTS'] = int(os.getenv('EMAIL_MAX_ATTEMPTS', 5))
+    app.config['EMAIL_RETRY_BACKOFF'] = float(os.getenv('EMAIL_RETRY_BACKOFF', 5))
+    app.config['EMAIL_POLL_INTERVAL'] = float(os.getenv('EMAIL_POLL_INTERVAL', 2))
 
 def initialize_extensions(app):
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
+    otp_hasher.init_app(app)
+    create_otp_store(app)
     mail.init_app(app)
+    smtp_pool.init_app(app)
+    email_outbox.init_app(app)
+    view_counter.init_app(app)
+    response_cache.init_app(app)
+    perf_monitor.init_app(app)
+    nplusone_detector.init_app(app)
+    metrics.init_app(app)
 
 def setup_user_loader():
     from app.models import User
@@ -62,6 +122,48 @@ def register_error_handlers(app):
     def not_found(e):
         return render_template('errors/404.html'), 404
 
+def register_commands(app):
+    import click
+    
+    @app.cli.command('render-markdown')
+    @click.option('--force', is_flag=True, help='Re-render every prompt, not only missing or stale HTML')
+    def render_markdown_command(force):
+        """Backfill pre-rendered markdown HTML for prompts"""
+        from app.routes.main import render_stale_prompts
+        count = render_stale_prompts(force=force)
+        click.echo(f"✅ Rendered markdown for {count} prompts")
+    
+    @app.cli.command('migrate-indexes')
+    def migrate_indexes_command():
+        """Create any declared database indexes missing from the current schema"""
+        from app.utils.schema import migrate_indexes
+        created = migrate_indexes()
+        click.echo(f"✅ Created {len(created)} indexes" + (f": {', '.join(created)}" if created else ''))
+    
+    @app.cli.command('process-outbox')
+    @click.option('--loop', is_flag=True, help='Keep delivering new messages instead of exiting when the queue is empty')
+    def process_outbox_command(loop):
+        """Deliver queued emails from the outbox"""
+        from app import email_outbox
+        if loop:
+            email_outbox.run_forever()
+        count = email_outbox.process()
+        click.echo(f"✅ Processed {count} queued emails")
+    
+    @app.cli.command('build-related')
+    def build_related_command():
+        """Recompute the related-prompts table for every prompt"""
+        from app.utils.related import rebuild_related
+        count = rebuild_related()
+        click.echo(f"✅ Computed related prompts for {count} prompts")
+
+def set_build_id(app):
+    """Identify this deploy in HTTP validators unless BUILD_ID was given"""
+    if not app.config.get('BUILD_ID'):
+        from app.routes.main import MARKDOWN_RENDER_VERSION
+        from app.utils.conditional import compute_build_id
+        app.config['BUILD_ID'] = compute_build_id(app, MARKDOWN_RENDER_VERSION)
+
 def create_app():
     app = Flask(__name__)
     configure_app(app)
@@ -69,6 +171,8 @@ def create_app():
     setup_user_loader()
     register_blueprints(app)
     register_error_handlers(app)
+    set_build_id(app)
+    register_commands(app)
     
     import logging
     logging.getLogger('smtplib').setLevel(logging.WARNING)
@@ -77,8 +181,19 @@ def create_app():
         try:
             db.create_all()
             app.logger.info("✅ Database tables created successfully")
+            
+            from app.utils.schema import migrate_indexes
+            created = migrate_indexes()
+            if created:
+                app.logger.info(f"✅ Created indexes: {', '.join(created)}")
         except Exception as e:
             app.logger.error(f"Database initialization failed: {e}")
             app.logger.info("Application will continue, but database may not be initialized")
+        
+        # Separate from the block above: a worker that lost a create_all race
+        # to another worker must still pick up the full-text index
+        from app.utils.fulltext import setup_fulltext
+        backend = setup_fulltext(app)
+        app.logger.info(f"✅ Full-text search backend: {backend}")
     
     return app
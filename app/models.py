@@ -1,6 +1,7 @@
-from app import db
+from app import db, otp_hasher
 from datetime import datetime
 from flask_login import UserMixin
+from sqlalchemy.orm import joinedload, selectinload
 from werkzeug.security import generate_password_hash, check_password_hash
 
 def get_current_timestamp():
@@ -8,7 +9,9 @@ def get_current_timestamp():
 
 prompt_tags = db.Table('prompt_tags',
     db.Column('prompt_id', db.Integer, db.ForeignKey('prompts.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    # The (prompt_id, tag_id) primary key cannot serve tag -> prompts lookups
+    db.Index('ix_prompt_tags_tag_prompt', 'tag_id', 'prompt_id')
 )
 
 class User(UserMixin, db.Model):
@@ -44,10 +47,10 @@ class OTP(db.Model):
     created_at = db.Column(db.DateTime, default=get_current_timestamp)
     
     def set_otp(self, otp):
-        self.otp_hash = generate_password_hash(str(otp))
+        self.otp_hash = otp_hasher.hash(otp)
     
     def check_otp(self, otp):
-        return check_password_hash(self.otp_hash, str(otp))
+        return otp_hasher.verify(self.otp_hash, otp)
     
     def is_expired(self):
         return datetime.utcnow() > self.expires_at
@@ -88,6 +91,14 @@ class Tag(db.Model):
 
 class Prompt(db.Model):
     __tablename__ = 'prompts'
+    # One index per listing order, and per equality filter followed by the default order
+    __table_args__ = (
+        db.Index('ix_prompts_created_at', 'created_at'),
+        db.Index('ix_prompts_views', 'views'),
+        db.Index('ix_prompts_rating', 'rating'),
+        db.Index('ix_prompts_category_created', 'category_id', 'created_at'),
+        db.Index('ix_prompts_difficulty_created', 'difficulty', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -101,15 +112,22 @@ class Prompt(db.Model):
     
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
     
-    tags = db.relationship('Tag', secondary=prompt_tags, lazy='subquery',
+    tags = db.relationship('Tag', secondary=prompt_tags, lazy='selectin',
                           backref=db.backref('prompts', lazy=True))
     
+    rendered = db.relationship('PromptRender', uselist=False, cascade='all, delete-orphan')
+    
     created_at = db.Column(db.DateTime, default=get_current_timestamp)
     updated_at = db.Column(db.DateTime, default=get_current_timestamp, onupdate=get_current_timestamp)
     
     def __repr__(self):
         return f'<Prompt {self.title}>'
     
+    @staticmethod
+    def load_options(profile):
+        """Loader options for a named profile ('listing', 'detail' or 'api')"""
+        return PROMPT_LOAD_PROFILES[profile]()
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -126,3 +144,83 @@ class Prompt(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class PromptRender(db.Model):
+    """Markdown fields of a prompt pre-rendered to HTML at save time"""
+    __tablename__ = 'prompt_renders'
+    
+    prompt_id = db.Column(db.Integer, db.ForeignKey('prompts.id'), primary_key=True)
+    content_html = db.Column(db.Text)
+    use_case_html = db.Column(db.Text)
+    examples_html = db.Column(db.Text)
+    version = db.Column(db.String(40), nullable=False)
+    rendered_at = db.Column(db.DateTime, default=get_current_timestamp, onupdate=get_current_timestamp)
+    
+    def __repr__(self):
+        return f'<PromptRender {self.prompt_id} {self.version}>'
+
+# Eager-loading profiles: each page loads every relationship its template touches
+# in a fixed number of queries, however many prompts it shows.
+PROMPT_LOAD_PROFILES = {
+    'listing': lambda: [
+        joinedload(Prompt.category_obj),
+        selectinload(Prompt.tags),
+    ],
+    'detail': lambda: [
+        joinedload(Prompt.category_obj),
+        joinedload(Prompt.rendered),
+        selectinload(Prompt.tags),
+    ],
+    'api': lambda: [
+        joinedload(Prompt.category_obj),
+        selectinload(Prompt.tags),
+    ],
+}
+
+class RelatedPrompt(db.Model):
+    """Precomputed top-K related prompts, refreshed whenever a prompt is saved"""
+    __tablename__ = 'related_prompts'
+    
+    prompt_id = db.Column(db.Integer, db.ForeignKey('prompts.id'), primary_key=True)
+    related_id = db.Column(db.Integer, db.ForeignKey('prompts.id'), primary_key=True, index=True)
+    score = db.Column(db.Float, nullable=False)
+    
+    def __repr__(self):
+        return f'<RelatedPrompt {self.prompt_id} -> {self.related_id} ({self.score:.3f})>'
+
+class CacheVersion(db.Model):
+    """Version counters bumped by writes so every worker can detect stale in-process caches"""
+    __tablename__ = 'cache_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=get_current_timestamp)
+    
+    def __repr__(self):
+        return f'<CacheVersion {self.name}={self.version}>'
+
+class OutboxEmail(db.Model):
+    """Outgoing email queued by request handlers and delivered by the outbox workers"""
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_due', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html_body = db.Column(db.Text)
+    text_body = db.Column(db.Text)
+    kind = db.Column(db.String(20), nullable=False, default='otp')
+    purpose = db.Column(db.String(20))
+    # pending -> sending -> sent, or back to pending with a later next_attempt_at, or failed
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=get_current_timestamp)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=get_current_timestamp)
+    sent_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<OutboxEmail {self.id} {self.kind} to {self.recipient} ({self.status})>'
@@ -1,7 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
 from flask_login import login_required, current_user
-from app import db
-from app.models import Prompt, Category, Tag
+from app import db, perf_monitor
+from app.models import Prompt, Category, Tag, prompt_tags
+from app.routes.main import markdown_cache, get_category_counts
+from app.utils.versions import bump_version, CATALOG_VERSION
+from app.utils.taxonomy import TAXONOMY_VERSION
 from functools import wraps
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -20,23 +23,44 @@ def superadmin_required(f):
 @admin_bp.route('/dashboard')
 @superadmin_required
 def dashboard():
-    total_prompts = Prompt.query.count()
-    total_categories = Category.query.count()
+    category_counts = get_category_counts()
+    categories = Category.query.order_by(Category.name).all()
+    total_prompts = sum(category_counts.values())
+    total_categories = len(categories)
     total_tags = Tag.query.count()
-    recent_prompts = Prompt.query.order_by(Prompt.created_at.desc()).limit(5).all()
+    recent_prompts = Prompt.query.options(*Prompt.load_options('listing')) \
+        .order_by(Prompt.created_at.desc()).limit(5).all()
     
     return render_template(
         'admin/dashboard.html',
         total_prompts=total_prompts,
         total_categories=total_categories,
         total_tags=total_tags,
-        recent_prompts=recent_prompts
+        recent_prompts=recent_prompts,
+        categories=categories,
+        category_counts=category_counts,
+        markdown_cache_stats=markdown_cache.stats()
+    )
+
+@admin_bp.route('/perf')
+@superadmin_required
+def perf():
+    records = perf_monitor.snapshot()
+    return render_template(
+        'admin/perf.html',
+        enabled=perf_monitor.enabled,
+        buffer_size=perf_monitor.records.maxlen,
+        request_count=len(records),
+        endpoints=perf_monitor.slowest_endpoints(limit=15),
+        queries=perf_monitor.slowest_queries(limit=15),
+        slowest_requests=sorted(records, key=lambda record: record['wall_ms'], reverse=True)[:20]
     )
 
 @admin_bp.route('/prompts')
 @superadmin_required
 def manage_prompts():
-    prompts = Prompt.query.order_by(Prompt.created_at.desc()).all()
+    prompts = Prompt.query.options(*Prompt.load_options('listing')) \
+        .order_by(Prompt.created_at.desc()).all()
     return render_template('admin/manage_prompts.html', prompts=prompts)
 
 @admin_bp.route('/categories', methods=['GET', 'POST'])
@@ -50,6 +74,7 @@ def manage_categories():
         
         category = Category(name=name, slug=slug, description=description, icon=icon)
         db.session.add(category)
+        bump_version(TAXONOMY_VERSION)
         db.session.commit()
         
         flash('Category created successfully', 'success')
@@ -63,6 +88,7 @@ def manage_categories():
 def delete_category(id):
     category = Category.query.get_or_404(id)
     db.session.delete(category)
+    bump_version(TAXONOMY_VERSION)
     db.session.commit()
     flash('Category deleted successfully', 'success')
     return redirect(url_for('admin.manage_categories'))
@@ -76,6 +102,7 @@ def manage_tags():
         
         tag = Tag(name=name, slug=slug)
         db.session.add(tag)
+        bump_version(TAXONOMY_VERSION)
         db.session.commit()
         
         flash('Tag created successfully', 'success')
@@ -88,7 +115,12 @@ def manage_tags():
 @superadmin_required
 def delete_tag(id):
     tag = Tag.query.get_or_404(id)
+    # Prompts carrying the tag lose it, which changes listings, facets and the filter index
+    tagged = db.session.query(prompt_tags.c.prompt_id).filter(prompt_tags.c.tag_id == tag.id).first()
     db.session.delete(tag)
+    bump_version(TAXONOMY_VERSION)
+    if tagged:
+        bump_version(CATALOG_VERSION)
     db.session.commit()
     flash('Tag deleted successfully', 'success')
     return redirect(url_for('admin.manage_tags'))
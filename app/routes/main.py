@@ -1,21 +1,99 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort,
+                   current_app, Response, stream_with_context, session)
 from flask_login import login_required, current_user
-from app import db
+from app import db, view_counter, response_cache, perf_monitor
 from datetime import datetime
-from app.models import Prompt, Category, Tag
-from sqlalchemy import or_, func
+from app.models import Prompt, Tag, PromptRender, prompt_tags
+from app.utils import fulltext, search_index, related, filter_index
+from app.utils.pagination import paginate, get_per_page, InvalidCursor, Page, DEFAULT_PER_PAGE
+from app.utils.cache import LRUCache
+from app.utils.taxonomy import get_taxonomy, get_tag_counts, TAXONOMY_VERSION
+from app.utils.versions import get_version, bump_version, CATALOG_VERSION, VIEWS_VERSION
+from app.utils.conditional import conditional_get
+from app.utils.facets import compute_facets
+from sqlalchemy import func, or_, select, exists
+from sqlalchemy.exc import IntegrityError
 import markdown2
+import hashlib
+import json
 
 main_bp = Blueprint('main', __name__)
 
+# Rows fetched per round trip when streaming /api/prompts
+STREAM_BATCH_SIZE = 500
+
 # Markdown configuration with extras
 MARKDOWN_EXTRAS = ['fenced-code-blocks', 'tables', 'break-on-newline', 'code-friendly']
 
+# Stored HTML made with a different renderer configuration is re-rendered
+MARKDOWN_RENDER_VERSION = hashlib.sha1(
+    json.dumps([markdown2.__version__, MARKDOWN_EXTRAS]).encode()
+).hexdigest()[:12]
+
+RENDERED_FIELDS = ['content', 'use_case', 'examples']
+RENDER_BATCH_SIZE = 200
+
+# Rendered HTML keyed by (content hash, renderer version); sized by MARKDOWN_CACHE_BYTES
+markdown_cache = LRUCache(max_bytes=16 * 1024 * 1024, name='markdown')
+
+@main_bp.record_once
+def configure_markdown_cache(state):
+    markdown_cache.resize(state.app.config.get('MARKDOWN_CACHE_BYTES', markdown_cache.max_bytes))
+
 def render_markdown(text):
-    """Convert markdown text to HTML"""
+    """Convert markdown text to HTML, memoized per distinct text"""
     if not text:
         return ''
-    return markdown2.markdown(text, extras=MARKDOWN_EXTRAS)
+    with perf_monitor.timer('markdown'):
+        key = (hashlib.sha256(text.encode()).hexdigest(), MARKDOWN_RENDER_VERSION)
+        return markdown_cache.get_or_set(key, lambda: markdown2.markdown(text, extras=MARKDOWN_EXTRAS))
+
+def render_prompt_html(prompt):
+    """Render the markdown fields of a prompt into its stored HTML"""
+    rendered = prompt.rendered or PromptRender()
+    for field in RENDERED_FIELDS:
+        setattr(rendered, f'{field}_html', render_markdown(getattr(prompt, field)))
+    rendered.version = MARKDOWN_RENDER_VERSION
+    prompt.rendered = rendered
+    return rendered
+
+def get_rendered_html(prompt):
+    """Stored HTML for a prompt, re-rendered once if missing or stale"""
+    rendered = prompt.rendered
+    if rendered is None or rendered.version != MARKDOWN_RENDER_VERSION:
+        rendered = render_prompt_html(prompt)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent first view stored this prompt's HTML first; use that row
+            db.session.rollback()
+            rendered = db.session.get(PromptRender, prompt.id) or rendered
+    return rendered
+
+def render_stale_prompts(force=False):
+    """Backfill stored HTML for prompts missing it or rendered with other extras"""
+    count = 0
+    last_id = 0
+    
+    while True:
+        query = Prompt.query.outerjoin(PromptRender).filter(Prompt.id > last_id)
+        if not force:
+            query = query.filter(or_(
+                PromptRender.prompt_id.is_(None),
+                PromptRender.version != MARKDOWN_RENDER_VERSION
+            ))
+        batch = query.order_by(Prompt.id).limit(RENDER_BATCH_SIZE).all()
+        if not batch:
+            break
+        
+        for prompt in batch:
+            render_prompt_html(prompt)
+        db.session.commit()
+        
+        count += len(batch)
+        last_id = batch[-1].id
+    
+    return count
 
 # Template filter for markdown
 @main_bp.app_template_filter('markdown')
@@ -23,66 +101,196 @@ def markdown_filter(text):
     return render_markdown(text)
 
 def get_all_categories():
-    """Get all categories ordered by name"""
-    return Category.query.order_by(Category.name).all()
+    """Get all categories ordered by name (from the taxonomy cache)"""
+    return get_taxonomy().categories
 
 def get_all_tags():
-    """Get all tags ordered by name"""
-    return Tag.query.order_by(Tag.name).all()
+    """Get all tags ordered by name (from the taxonomy cache)"""
+    return get_taxonomy().tags
 
-def get_filtered_prompts(search_query=None, category_slug=None, tag_slug=None, 
+def get_category_counts():
+    """Prompt count per category id from one GROUP BY aggregate"""
+    rows = db.session.query(Prompt.category_id, func.count(Prompt.id)).group_by(Prompt.category_id)
+    return {category_id: count for category_id, count in rows}
+
+def apply_search(query, search_query, ranked=True):
+    """Apply the configured search engine ('database' full-text or in-process 'memory')"""
+    if current_app.config.get('SEARCH_ENGINE') == 'memory':
+        return search_index.apply_search(query, search_query, ranked=ranked)
+    return fulltext.apply_search(query, search_query)
+
+SORT_COLUMNS = {
+    'newest': Prompt.created_at,
+    'popular': Prompt.views,
+    'rating': Prompt.rating,
+}
+
+def tag_filter(tag_id, walk_sort_index=True):
+    """Criterion for prompts carrying a tag, shaped for the cheaper plan.
+
+    For a common tag, a correlated EXISTS lets the database walk the sort
+    column's index and stop after one page, probing prompt_tags by primary
+    key. For a rare tag that walk would pass most of the catalog, so an IN
+    over the tag's rows is used and its few matches are sorted instead. The
+    crossover is where both read about the same number of rows: tagged
+    prompts > sqrt(total prompts * page size).
+    """
+    if walk_sort_index:
+        counts = get_tag_counts()
+        tagged = counts.by_tag.get(tag_id, 0)
+        if tagged * tagged > counts.total * DEFAULT_PER_PAGE:
+            return exists().where(prompt_tags.c.prompt_id == Prompt.id, prompt_tags.c.tag_id == tag_id)
+    return Prompt.id.in_(select(prompt_tags.c.prompt_id).where(prompt_tags.c.tag_id == tag_id))
+
+def get_sort_order(sort_by, relevance=None):
+    """Keyset ordering for a sort option, always ending in the id tie-breaker"""
+    if sort_by == 'relevance' and relevance is not None:
+        return [(relevance, False), (Prompt.created_at, True), (Prompt.id, True)]
+    column = SORT_COLUMNS.get(sort_by, Prompt.created_at)
+    return [(column, True), (Prompt.id, True)]
+
+def build_filtered_query(search_query=None, category_slug=None, tag_slug=None,
                          difficulty=None, sort_by='newest'):
-    """Get prompts with filters applied"""
-    query = Prompt.query
+    """Build the filtered prompt query and its keyset ordering"""
+    query = Prompt.query.options(*Prompt.load_options('listing'))
+    relevance = None
     
     # Search filter
     if search_query:
-        search_pattern = f'%{search_query}%'
-        query = query.filter(
-            or_(
-                Prompt.title.ilike(search_pattern),
-                Prompt.description.ilike(search_pattern),
-                Prompt.content.ilike(search_pattern),
-                Prompt.use_case.ilike(search_pattern)
-            )
-        )
+        query, relevance = apply_search(query, search_query, ranked=sort_by == 'relevance')
+    
+    taxonomy = get_taxonomy()
     
     # Category filter
     if category_slug:
-        category = Category.query.filter_by(slug=category_slug).first()
-        if category:
-            query = query.filter(Prompt.category_id == category.id)
+        category_id = taxonomy.category_id(category_slug)
+        if category_id:
+            query = query.filter(Prompt.category_id == category_id)
     
     # Tag filter
     if tag_slug:
-        tag = Tag.query.filter_by(slug=tag_slug).first()
-        if tag:
-            query = query.filter(Prompt.tags.contains(tag))
+        tag_id = taxonomy.tag_id(tag_slug)
+        if tag_id:
+            query = query.filter(tag_filter(tag_id, walk_sort_index=not search_query))
     
     # Difficulty filter
     if difficulty:
         query = query.filter(Prompt.difficulty == difficulty)
     
     # Sorting
-    if sort_by == 'newest':
-        query = query.order_by(Prompt.created_at.desc())
-    elif sort_by == 'popular':
-        query = query.order_by(Prompt.views.desc())
-    elif sort_by == 'rating':
-        query = query.order_by(Prompt.rating.desc())
-    else:
-        query = query.order_by(Prompt.created_at.desc())
+    if sort_by not in SORT_COLUMNS and not (sort_by == 'relevance' and relevance is not None):
+        sort_by = 'newest'
+    return query, get_sort_order(sort_by, relevance), sort_by
+
+def get_filtered_prompts(search_query=None, category_slug=None, tag_slug=None, 
+                         difficulty=None, sort_by='newest', cursor=None, per_page=DEFAULT_PER_PAGE,
+                         with_facets=False):
+    """Get one page of prompts with filters applied.
+
+    With `with_facets`, the page's `facets` attribute holds hit counts per
+    category, tag and difficulty for the whole filtered result.
+    """
+    if use_filter_index(search_query, sort_by):
+        return get_indexed_prompts(category_slug, tag_slug, difficulty, sort_by,
+                                   cursor, per_page, with_facets)
     
-    return query.all()
+    query, order, sort_by = build_filtered_query(
+        search_query=search_query,
+        category_slug=category_slug,
+        tag_slug=tag_slug,
+        difficulty=difficulty,
+        sort_by=sort_by
+    )
+    page = paginate(query, order, sort_by, cursor=cursor, per_page=per_page)
+    page.facets = compute_facets(query) if with_facets else None
+    return page
+
+def use_filter_index(search_query, sort_by):
+    """Filter-only browsing in an indexed sort order can be served from the bitmap index"""
+    return (current_app.config.get('FILTER_INDEX') and not search_query
+            and sort_by in filter_index.INDEXED_SORTS)
 
-def get_prompt_by_id(prompt_id):
-    """Get prompt by ID or 404"""
-    return Prompt.query.get_or_404(prompt_id)
+def match_filter_index(category_slug=None, tag_slug=None, difficulty=None):
+    """Bitmap of prompts passing the filters; unknown slugs are ignored like in SQL"""
+    taxonomy = get_taxonomy()
+    index = filter_index.get_filter_index()
+    mask = index.match(
+        category_id=taxonomy.category_id(category_slug) if category_slug else None,
+        tag_id=taxonomy.tag_id(tag_slug) if tag_slug else None,
+        difficulty=difficulty or None
+    )
+    return index, mask
+
+def get_indexed_prompts(category_slug, tag_slug, difficulty, sort_by, cursor, per_page, with_facets):
+    """get_filtered_prompts from the bitmap index; the database only loads the final page"""
+    index, mask = match_filter_index(category_slug, tag_slug, difficulty)
+    prompt_ids, next_cursor, prev_cursor = index.page(mask, sort_by, cursor=cursor, per_page=per_page)
+    
+    prompts = {}
+    if prompt_ids:
+        rows = Prompt.query.options(*Prompt.load_options('listing')).filter(Prompt.id.in_(prompt_ids))
+        prompts = {prompt.id: prompt for prompt in rows}
+    
+    page = Page([prompts[prompt_id] for prompt_id in prompt_ids if prompt_id in prompts],
+                next_cursor=next_cursor, prev_cursor=prev_cursor)
+    page.facets = index.facets(mask) if with_facets else None
+    return page
+
+def iter_prompt_dicts(query, order):
+    """Yield batches of serialized prompts without materializing the whole result.
+
+    Rows are fetched `yield_per` at a time with category and tags eager-loaded per
+    batch, so memory stays flat however large the catalog is.
+    """
+    query = query.options(*Prompt.load_options('api')).order_by(
+        *[column.desc() if descending else column.asc() for column, descending in order]
+    )
+    
+    batch = []
+    for prompt in query.yield_per(STREAM_BATCH_SIZE):
+        batch.append(prompt.to_dict())
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def generate_ndjson(query, order):
+    """One JSON document per line"""
+    for batch in iter_prompt_dicts(query, order):
+        yield ''.join(json.dumps(item) + '\n' for item in batch)
+
+def generate_json_array(query, order):
+    """A single JSON array emitted incrementally"""
+    yield '['
+    separator = ''
+    for batch in iter_prompt_dicts(query, order):
+        yield separator + ','.join(json.dumps(item) for item in batch)
+        separator = ','
+    yield ']'
+
+STREAM_FORMATS = {
+    'ndjson': (generate_ndjson, 'application/x-ndjson'),
+    'stream': (generate_json_array, 'application/json'),
+}
+
+def get_page_urls(page, endpoint, **params):
+    """Build prev/next URLs for a page, keeping the non-empty request parameters"""
+    params = {key: value for key, value in params.items() if value}
+    prev_url = url_for(endpoint, cursor=page.prev_cursor, **params) if page.has_prev else None
+    next_url = url_for(endpoint, cursor=page.next_cursor, **params) if page.has_next else None
+    return prev_url, next_url
+
+def get_prompt_by_id(prompt_id, profile=None):
+    """Get prompt by ID or 404, optionally eager-loading a profile"""
+    query = Prompt.query
+    if profile:
+        query = query.options(*Prompt.load_options(profile))
+    return query.get_or_404(prompt_id)
 
 def increment_prompt_views(prompt):
-    """Increment view count for a prompt"""
-    prompt.views += 1
-    db.session.commit()
+    """Buffer a view of a prompt; counts are written in batches by view_counter"""
+    view_counter.record(prompt.id)
 
 def extract_form_data():
     """Extract form data for prompt creation/update"""
@@ -107,6 +315,7 @@ def create_prompt_from_data(data):
         tags = Tag.query.filter(Tag.id.in_(tag_ids)).all()
         prompt.tags = tags
     
+    render_prompt_html(prompt)
     return prompt
 
 def update_prompt_fields(prompt, data):
@@ -122,6 +331,7 @@ def update_prompt_fields(prompt, data):
         prompt.tags = tags
     
     prompt.updated_at = datetime.utcnow()
+    render_prompt_html(prompt)
     return prompt
 
 def save_to_database(obj):
@@ -134,27 +344,78 @@ def delete_from_database(obj):
     db.session.delete(obj)
     db.session.commit()
 
+def normalize_filter_args(args):
+    """Canonical homepage filter parameters, so equivalent URLs share one rendering"""
+    search_query = ' '.join(args.get('search', '').split())
+    sort_by = args.get('sort', 'relevance' if search_query else 'newest')
+    if sort_by not in SORT_COLUMNS and not (sort_by == 'relevance' and search_query):
+        sort_by = 'newest'
+    return {
+        'search': search_query,
+        'category': args.get('category', '').strip(),
+        'tag': args.get('tag', '').strip(),
+        'difficulty': args.get('difficulty', '').strip(),
+        'sort': sort_by,
+        'cursor': args.get('cursor', ''),
+    }
+
+def is_response_cacheable():
+    """Only anonymous pages without pending flash messages are shared between visitors"""
+    return (response_cache.enabled and not current_user.is_authenticated
+            and '_flashes' not in session)
+
 @main_bp.route('/')
 def index():
     """Homepage with search and filtering"""
     # Get filter parameters
-    search_query = request.args.get('search', '')
-    category_slug = request.args.get('category', '')
-    tag_slug = request.args.get('tag', '')
-    difficulty = request.args.get('difficulty', '')
-    sort_by = request.args.get('sort', 'newest')
+    filters = normalize_filter_args(request.args)
+    
+    cache_key = None
+    if is_response_cacheable():
+        cache_key = response_cache.make_key('index', filters, {
+            CATALOG_VERSION: get_version(CATALOG_VERSION),
+            TAXONOMY_VERSION: get_version(TAXONOMY_VERSION),
+        })
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    html = render_index(filters)
+    if cache_key:
+        response_cache.set(cache_key, html)
+    return html
+
+def render_index(filters):
+    search_query = filters['search']
+    category_slug = filters['category']
+    tag_slug = filters['tag']
+    difficulty = filters['difficulty']
+    sort_by = filters['sort']
+    cursor = filters['cursor']
     
     # Get filtered prompts
-    prompts = get_filtered_prompts(
-        search_query=search_query if search_query else None,
-        category_slug=category_slug if category_slug else None,
-        tag_slug=tag_slug if tag_slug else None,
-        difficulty=difficulty if difficulty else None,
-        sort_by=sort_by
+    try:
+        page = get_filtered_prompts(
+            search_query=search_query if search_query else None,
+            category_slug=category_slug if category_slug else None,
+            tag_slug=tag_slug if tag_slug else None,
+            difficulty=difficulty if difficulty else None,
+            sort_by=sort_by,
+            cursor=cursor,
+            with_facets=True
+        )
+    except InvalidCursor:
+        abort(400)
+    
+    prev_url, next_url = get_page_urls(
+        page, 'main.index',
+        search=search_query, category=category_slug, tag=tag_slug,
+        difficulty=difficulty, sort=sort_by
     )
     
     # Get all categories and tags for filters
     categories = get_all_categories()
+    category_counts = get_category_counts()
     tags = get_all_tags()
     
     # Difficulty options
@@ -162,8 +423,12 @@ def index():
     
     return render_template(
         'index.html',
-        prompts=prompts,
+        prompts=page.items,
+        facets=page.facets,
+        prev_url=prev_url,
+        next_url=next_url,
         categories=categories,
+        category_counts=category_counts,
         tags=tags,
         difficulties=difficulties,
         current_search=search_query,
@@ -173,34 +438,48 @@ def index():
         current_sort=sort_by
     )
 
-
 @main_bp.route('/prompt/<int:id>')
 @login_required
+@conditional_get(CATALOG_VERSION, TAXONOMY_VERSION, VIEWS_VERSION, per_user=True,
+                 on_not_modified=lambda id: view_counter.record(id))
 def view_prompt(id):
-    prompt = get_prompt_by_id(id)
+    prompt = get_prompt_by_id(id, profile='detail')
     increment_prompt_views(prompt)
     
-    related_prompts = Prompt.query.filter(
-        Prompt.category_id == prompt.category_id,
-        Prompt.id != prompt.id
-    ).order_by(func.random()).limit(3).all()
+    # May commit a fresh rendering; done first so it cannot expire the related prompts
+    rendered = get_rendered_html(prompt)
+    related_prompts = related.get_related_prompts(prompt)
     
     return render_template(
         'view_prompt.html',
         prompt=prompt,
+        rendered=rendered,
         related_prompts=related_prompts
     )
 
 @main_bp.route('/category/<slug>')
+@conditional_get(CATALOG_VERSION, TAXONOMY_VERSION, VIEWS_VERSION, per_user=True)
 def category(slug):
     """View prompts by category"""
-    category = Category.query.filter_by(slug=slug).first_or_404()
-    prompts = Prompt.query.filter_by(category_id=category.id).order_by(Prompt.created_at.desc()).all()
+    category = get_taxonomy().categories_by_slug.get(slug)
+    if category is None:
+        abort(404)
+    query = Prompt.query.options(*Prompt.load_options('listing')).filter_by(category_id=category.id)
+    
+    try:
+        page = paginate(query, get_sort_order('newest'), 'newest', cursor=request.args.get('cursor'))
+    except InvalidCursor:
+        abort(400)
+    
+    prev_url, next_url = get_page_urls(page, 'main.category', slug=slug)
     
     return render_template(
         'category.html',
         category=category,
-        prompts=prompts
+        prompts=page.items,
+        prompt_count=Prompt.query.filter_by(category_id=category.id).count(),
+        prev_url=prev_url,
+        next_url=next_url
     )
 
 @main_bp.route('/add', methods=['GET', 'POST'])
@@ -213,6 +492,11 @@ def add_prompt():
         data = extract_form_data()
         prompt = create_prompt_from_data(data)
         save_to_database(prompt)
+        related.refresh_related(prompt)
+        bump_version(CATALOG_VERSION)
+        db.session.commit()
+        filter_index.index_prompt(prompt)
+        search_index.index_prompt(prompt)
         flash('Prompt added successfully!', 'success')
         return redirect(url_for('main.view_prompt', id=prompt.id))
     
@@ -239,6 +523,11 @@ def edit_prompt(id):
         data = extract_form_data()
         updated_prompt = update_prompt_fields(prompt, data)
         save_to_database(updated_prompt)
+        related.refresh_related(updated_prompt)
+        bump_version(CATALOG_VERSION)
+        db.session.commit()
+        filter_index.index_prompt(updated_prompt)
+        search_index.index_prompt(updated_prompt)
         flash('Prompt updated successfully!', 'success')
         return redirect(url_for('main.view_prompt', id=id))
     
@@ -261,24 +550,106 @@ def delete_prompt(id):
         abort(403)
     
     prompt = get_prompt_by_id(id)
+    affected = related.forget_related(id)
+    bump_version(CATALOG_VERSION)
     delete_from_database(prompt)
+    search_index.unindex_prompt(id)
+    filter_index.unindex_prompt(id)
+    related.refresh_related_ids(affected)
     flash('Prompt deleted successfully!', 'success')
     return redirect(url_for('main.index'))
 
 @main_bp.route('/api/prompts')
+@conditional_get(CATALOG_VERSION, TAXONOMY_VERSION, VIEWS_VERSION)
 def api_prompts():
-    """API endpoint for prompts (JSON)"""
-    prompts = Prompt.query.all()
-    return jsonify([prompt.to_dict() for prompt in prompts])
+    """API endpoint for prompts (JSON), one keyset page per request.
+
+    Neighbouring pages are advertised in the Link header (rel="next"/"prev").
+    With ?format=ndjson (one object per line) or ?format=stream (chunked JSON
+    array) every matching prompt is streamed instead.
+    """
+    params = {
+        'search': request.args.get('search', ''),
+        'category': request.args.get('category', ''),
+        'tag': request.args.get('tag', ''),
+        'difficulty': request.args.get('difficulty', ''),
+        'sort': request.args.get('sort', 'newest'),
+        'limit': request.args.get('limit', ''),
+    }
+    
+    stream_format = STREAM_FORMATS.get(request.args.get('format'))
+    if stream_format:
+        generate, mimetype = stream_format
+        query, order, _ = build_filtered_query(
+            search_query=params['search'] or None,
+            category_slug=params['category'] or None,
+            tag_slug=params['tag'] or None,
+            difficulty=params['difficulty'] or None,
+            sort_by=params['sort']
+        )
+        return Response(stream_with_context(generate(query, order)), mimetype=mimetype)
+    
+    try:
+        page = get_filtered_prompts(
+            search_query=params['search'] or None,
+            category_slug=params['category'] or None,
+            tag_slug=params['tag'] or None,
+            difficulty=params['difficulty'] or None,
+            sort_by=params['sort'],
+            cursor=request.args.get('cursor'),
+            per_page=get_per_page(params['limit'], default=50)
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = jsonify([prompt.to_dict() for prompt in page.items])
+    
+    prev_url, next_url = get_page_urls(page, 'main.api_prompts', _external=True, **params)
+    links = []
+    if next_url:
+        links.append(f'<{next_url}>; rel="next"')
+    if prev_url:
+        links.append(f'<{prev_url}>; rel="prev"')
+    if links:
+        response.headers['Link'] = ', '.join(links)
+    return response
+
+@main_bp.route('/api/prompts/facets')
+@conditional_get(CATALOG_VERSION, TAXONOMY_VERSION)
+def api_prompt_facets():
+    """Facet counts for the filters accepted by /api/prompts, keyed by slug"""
+    filters = {
+        'search_query': request.args.get('search') or None,
+        'category_slug': request.args.get('category') or None,
+        'tag_slug': request.args.get('tag') or None,
+        'difficulty': request.args.get('difficulty') or None,
+    }
+    if use_filter_index(filters['search_query'], 'newest'):
+        index, mask = match_filter_index(filters['category_slug'], filters['tag_slug'], filters['difficulty'])
+        facets = index.facets(mask)
+    else:
+        query, _, _ = build_filtered_query(**filters)
+        facets = compute_facets(query)
+    
+    return jsonify({
+        'total': facets['total'],
+        'categories': {c.slug: facets['categories'][c.id]
+                       for c in get_all_categories() if c.id in facets['categories']},
+        'tags': {t.slug: facets['tags'][t.id]
+                 for t in get_all_tags() if t.id in facets['tags']},
+        'difficulties': facets['difficulties']
+    })
 
 @main_bp.route('/api/categories')
+@conditional_get(CATALOG_VERSION, TAXONOMY_VERSION)
 def api_categories():
     """API endpoint for categories (JSON)"""
-    categories = Category.query.all()
+    categories = get_all_categories()
+    category_counts = get_category_counts()
     return jsonify([{
         'id': c.id,
         'name': c.name,
         'slug': c.slug,
         'icon': c.icon,
-        'prompt_count': c.prompts.count()
+        'prompt_count': category_counts.get(c.id, 0)
     } for c in categories])
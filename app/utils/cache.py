@@ -0,0 +1,106 @@
+import sys
+import threading
+from collections import OrderedDict
+from app.utils.metrics import record_cache_lookup
+
+def estimate_size(key, value):
+    """Approximate memory held by a cache entry, in bytes"""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+class LRUCache:
+    """Process-local least-recently-used cache bounded by a memory budget in bytes.
+
+    Entries larger than the whole budget are not stored. Hit, miss and
+    eviction counters are kept so the budget can be sized from real traffic;
+    a named cache also reports its lookups to the metrics endpoint.
+    """
+
+    def __init__(self, max_bytes, sizeof=estimate_size, name=None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if self.name:
+            record_cache_lookup(self.name, entry is not None)
+        return default if entry is None else entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(key, value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+    def get_or_set(self, key, factory):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hit_ratio, 4),
+        }
+
+_MISSING = object()
@@ -0,0 +1,93 @@
+import hashlib
+import os
+from functools import wraps
+from flask import request, session, make_response, current_app
+from flask_login import current_user
+from app.utils.versions import get_version_info
+
+def user_variant():
+    """Which navigation a page renders with; pages vary by role, not by individual user"""
+    if not current_user.is_authenticated:
+        return 'anonymous'
+    return 'admin' if current_user.is_superadmin() else 'user'
+
+# Source files whose changes can change a rendered page
+BUILD_FILE_SUFFIXES = ('.py', '.html', '.txt')
+
+def compute_build_id(app, *extra):
+    """Fingerprint of the deployed code and templates, taken once at startup.
+
+    Built from the path, size and mtime of every source and template file
+    under the app package plus `extra` (e.g. the markdown renderer version),
+    so a deploy that changes what pages render as also changes their ETags.
+    Hosts with separate checkouts can set BUILD_ID instead to share one value.
+    """
+    digest = hashlib.sha256()
+    for part in extra:
+        digest.update(f'{part}\x1f'.encode())
+    for directory, subdirectories, files in os.walk(app.root_path):
+        subdirectories[:] = sorted(name for name in subdirectories if name != '__pycache__')
+        for name in sorted(files):
+            if not name.endswith(BUILD_FILE_SUFFIXES):
+                continue
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            digest.update(f'{os.path.relpath(path, app.root_path)}:{stat.st_size}:{stat.st_mtime_ns}\x1f'.encode())
+    return digest.hexdigest()[:12]
+
+def compute_validators(version_names, variant=None):
+    """Strong ETag and Last-Modified derived only from version counters and the build (no row loads)"""
+    infos = [(name,) + tuple(get_version_info(name)) for name in version_names]
+    parts = [current_app.config.get('BUILD_ID') or '', request.endpoint, request.full_path, variant or '']
+    parts += [f'{name}={version}' for name, version, _ in infos]
+    etag = hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()[:32]
+
+    timestamps = [updated_at for _, _, updated_at in infos if updated_at]
+    last_modified = max(timestamps).replace(microsecond=0) if timestamps else None
+    return etag, last_modified
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+def set_validators(response, etag, last_modified, private=False):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+    if private:
+        response.vary.add('Cookie')
+    return response
+
+def conditional_get(*version_names, per_user=False, on_not_modified=None):
+    """Answer 304 Not Modified before running the view when the validators match.
+
+    The validators are built from the named version counters, so a revalidation
+    costs one small query and no template or row work. `per_user` varies them by
+    role for HTML pages; `on_not_modified(**view_args)` runs on a 304.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Flash messages are one-off content and must never be revalidated
+            if request.method != 'GET' or '_flashes' in session:
+                return f(*args, **kwargs)
+
+            etag, last_modified = compute_validators(
+                version_names, variant=user_variant() if per_user else None
+            )
+            if is_not_modified(etag, last_modified):
+                if on_not_modified:
+                    on_not_modified(*args, **kwargs)
+                response = make_response('', 304)
+                return set_validators(response, etag, last_modified, private=per_user)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                set_validators(response, etag, last_modified, private=per_user)
+            return response
+        return decorated_function
+    return decorator
@@ -1,157 +1,112 @@
-from flask_mail import Message
+import re
+import threading
 from flask import current_app
+from markupsafe import escape
+from app.utils.otp import OTP_EXPIRY_MINUTES
 
-def get_mail():
-    from app import mail
-    return mail
+# Stand-in rendered where a per-message value goes; survives HTML escaping
+_SLOT_MARKER = '\x1e{}\x1e'
+_SLOT = re.compile('\x1e(\\w+)\x1e')
 
-def send_otp_email(email, otp_code, purpose):
-    mail = get_mail()
-    
-    subject_map = {
-        'signup': 'Verify Your Email - Prompt Khajana',
-        'login': 'Login Verification Code - Prompt Khajana',
-        'reset': 'Password Reset Code - Prompt Khajana'
-    }
-    
-    purpose_text_map = {
-        'signup': 'complete your registration',
-        'login': 'log in to your account',
-        'reset': 'reset your password'
-    }
-    
-    subject = subject_map.get(purpose, 'Verification Code - Prompt Khajana')
-    purpose_text = purpose_text_map.get(purpose, 'verify your request')
-    
-    html_body = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background-color: #f4f4f4;
-                margin: 0;
-                padding: 0;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: 40px auto;
-                background-color: #ffffff;
-                border-radius: 10px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                overflow: hidden;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                text-align: center;
-            }}
-            .header h1 {{
-                margin: 0;
-                font-size: 28px;
-            }}
-            .content {{
-                padding: 40px 30px;
-            }}
-            .otp-box {{
-                background-color: #f8f9fa;
-                border: 2px dashed #667eea;
-                border-radius: 8px;
-                padding: 20px;
-                text-align: center;
-                margin: 30px 0;
-            }}
-            .otp-code {{
-                font-size: 36px;
-                font-weight: bold;
-                color: #667eea;
-                letter-spacing: 8px;
-                font-family: 'Courier New', monospace;
-            }}
-            .warning {{
-                background-color: #fff3cd;
-                border-left: 4px solid #ffc107;
-                padding: 15px;
-                margin: 20px 0;
-                border-radius: 4px;
-            }}
-            .footer {{
-                background-color: #f8f9fa;
-                padding: 20px;
-                text-align: center;
-                color: #6c757d;
-                font-size: 14px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🔐 Prompt Khajana</h1>
-            </div>
-            <div class="content">
-                <h2>Email Verification Code</h2>
-                <p>Hello,</p>
-                <p>You requested to {purpose_text}. Please use the following One-Time Password (OTP) to proceed:</p>
-                
-                <div class="otp-box">
-                    <div class="otp-code">{otp_code}</div>
-                </div>
-                
-                <p><strong>This code will expire in 10 minutes.</strong></p>
-                
-                <div class="warning">
-                    <strong>⚠️ Security Notice:</strong>
-                    <ul style="margin: 10px 0; padding-left: 20px;">
-                        <li>Never share this code with anyone</li>
-                        <li>Our team will never ask for your OTP</li>
-                        <li>If you didn't request this, please ignore this email</li>
-                    </ul>
-                </div>
-                
-                <p>If you have any questions, please contact our support team.</p>
-                <p>Best regards,<br><strong>Prompt Khajana Team</strong></p>
-            </div>
-            <div class="footer">
-                <p>This is an automated message, please do not reply to this email.</p>
-                <p>&copy; 2025 Prompt Khajana. All rights reserved.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    
-    text_body = f"""
-    Prompt Khajana - Email Verification
-    
-    Hello,
-    
-    You requested to {purpose_text}. Please use the following One-Time Password (OTP):
-    
-    {otp_code}
-    
-    This code will expire in 10 minutes.
-    
-    Security Notice:
-    - Never share this code with anyone
-    - Our team will never ask for your OTP
-    - If you didn't request this, please ignore this email
-    
-    Best regards,
-    Prompt Khajana Team
+EMAIL_TYPES = {}
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+def register_email_type(kind, template, subject, slots, variants=None, context=None):
+    """Register a mail kind rendered from email/<template>.html and email/<template>.txt.
+
+    `slots` name the values that change per message; they must be output as
+    plain `{{ name }}` in the templates. Everything else is rendered once per
+    variant and cached. `variants` maps a variant (e.g. an OTP purpose) to
+    its `subject` and extra template context; unknown variants fall back to
+    `subject` and `context`.
     """
-    
+    EMAIL_TYPES[kind] = {
+        'template': template,
+        'subject': subject,
+        'slots': tuple(slots),
+        'variants': variants or {},
+        'context': context or {},
+    }
+    with _compiled_lock:
+        for key in [key for key in _compiled if key[0] == kind]:
+            del _compiled[key]
+
+def _split(rendered):
+    # Static text at even positions, slot names at odd ones
+    return _SLOT.split(rendered)
+
+def compile_email(kind, variant=None):
+    """Subject and pre-rendered (html, text) parts for one kind and variant"""
+    spec = EMAIL_TYPES[kind]
+    variant_spec = spec['variants'].get(variant, {})
+    context = dict(spec['context'])
+    context.update((key, value) for key, value in variant_spec.items() if key != 'subject')
+    context.update((slot, _SLOT_MARKER.format(slot)) for slot in spec['slots'])
+
+    env = current_app.jinja_env
+    html = env.get_template(f"email/{spec['template']}.html").render(context)
+    text = env.get_template(f"email/{spec['template']}.txt").render(context)
+    return variant_spec.get('subject', spec['subject']), _split(html), _split(text)
+
+def _compiled_email(kind, variant):
+    # Re-render every time while templates auto-reload (debug), so edits show up
+    if current_app.jinja_env.auto_reload:
+        return compile_email(kind, variant)
+    # Unknown variants all render the defaults; share one entry
+    key = (kind, variant if variant in EMAIL_TYPES[kind]['variants'] else None)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = compile_email(kind, variant)
+        with _compiled_lock:
+            _compiled[key] = compiled
+    return compiled
+
+def _fill(parts, values, html):
+    filled = list(parts)
+    for i in range(1, len(filled), 2):
+        value = values[filled[i]]
+        filled[i] = str(escape(value)) if html else str(value)
+    return ''.join(filled)
+
+def render_email(kind, variant=None, **values):
+    """(subject, html_body, text_body) for a message of a registered kind"""
+    subject, html_parts, text_parts = _compiled_email(kind, variant)
+    return subject, _fill(html_parts, values, html=True), _fill(text_parts, values, html=False)
+
+def get_outbox():
+    from app import email_outbox
+    return email_outbox
+
+def send_email(recipient, kind, variant=None, **values):
+    """Queue a message of a registered kind; delivery happens in the outbox workers"""
     try:
-        msg = Message(
+        subject, html_body, text_body = render_email(kind, variant, **values)
+        get_outbox().enqueue(
+            recipient=recipient,
             subject=subject,
-            recipients=[email],
-            html=html_body,
-            body=text_body
+            html_body=html_body,
+            text_body=text_body,
+            kind=kind,
+            purpose=variant
         )
-        mail.send(msg)
         return True
     except Exception as e:
-        current_app.logger.error(f"Failed to send email: {str(e)}")
+        current_app.logger.error(f"Failed to queue email: {str(e)}")
         return False
+
+def send_otp_email(email, otp_code, purpose):
+    """Queue an OTP email; delivery happens in the outbox workers"""
+    return send_email(email, 'otp', purpose, otp_code=otp_code)
+
+register_email_type(
+    'otp', 'otp',
+    subject='Verification Code - Prompt Khajana',
+    slots=['otp_code'],
+    context={'purpose_text': 'verify your request', 'expiry_minutes': OTP_EXPIRY_MINUTES},
+    variants={
+        'signup': {'subject': 'Verify Your Email - Prompt Khajana', 'purpose_text': 'complete your registration'},
+        'login': {'subject': 'Login Verification Code - Prompt Khajana', 'purpose_text': 'log in to your account'},
+        'reset': {'subject': 'Password Reset Code - Prompt Khajana', 'purpose_text': 'reset your password'},
+    }
+)
@@ -0,0 +1,47 @@
+from sqlalchemy import func, literal, select, union_all, cast, String
+from app import db
+from app.models import Prompt, prompt_tags
+
+def compute_facets(query):
+    """Hit counts per category, tag and difficulty for a filtered Prompt query.
+
+    All three groupings come back from one UNION ALL statement over the
+    filtered ids, so the cost is one aggregate pass instead of one COUNT per
+    facet value. Returns {'total', 'categories', 'tags', 'difficulties'}, the
+    first two keyed by id.
+    """
+    matches = query.order_by(None).with_entities(
+        Prompt.id.label('id'),
+        Prompt.category_id.label('category_id'),
+        Prompt.difficulty.label('difficulty')
+    ).subquery()
+
+    by_category = select(
+        literal('category').label('facet'),
+        cast(matches.c.category_id, String).label('value'),
+        func.count().label('hits')
+    ).group_by(matches.c.category_id)
+
+    by_difficulty = select(
+        literal('difficulty').label('facet'),
+        matches.c.difficulty.label('value'),
+        func.count().label('hits')
+    ).group_by(matches.c.difficulty)
+
+    by_tag = select(
+        literal('tag').label('facet'),
+        cast(prompt_tags.c.tag_id, String).label('value'),
+        func.count().label('hits')
+    ).select_from(matches.join(prompt_tags, prompt_tags.c.prompt_id == matches.c.id)) \
+        .group_by(prompt_tags.c.tag_id)
+
+    facets = {'total': 0, 'categories': {}, 'tags': {}, 'difficulties': {}}
+    for facet, value, hits in db.session.execute(union_all(by_category, by_difficulty, by_tag)):
+        if facet == 'category':
+            facets['categories'][int(value)] = hits
+            facets['total'] += hits
+        elif facet == 'tag':
+            facets['tags'][int(value)] = hits
+        elif value:
+            facets['difficulties'][value] = hits
+    return facets
@@ -0,0 +1,212 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.snapshot import CatalogSnapshot
+
+# Sorts whose keys only change through prompt writes; 'popular' moves with every
+# view flush and stays on the SQL path
+INDEXED_SORTS = ('newest', 'rating')
+
+def _bitmap(prompt_ids):
+    """Python int with bit `id` set for every id, built in O(n)"""
+    prompt_ids = list(prompt_ids)
+    if not prompt_ids:
+        return 0
+    bits = bytearray(max(prompt_ids) // 8 + 1)
+    for prompt_id in prompt_ids:
+        bits[prompt_id >> 3] |= 1 << (prompt_id & 7)
+    return int.from_bytes(bits, 'little')
+
+class PromptBits:
+    """Constant-time membership tests against a bitmap"""
+
+    def __init__(self, mask):
+        self.mask = mask
+        self.bits = mask.to_bytes(mask.bit_length() // 8 + 1, 'little')
+
+    def __contains__(self, prompt_id):
+        byte = prompt_id >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] >> (prompt_id & 7) & 1)
+
+class FilterIndex:
+    """In-memory bitmaps of prompt ids per category, tag and difficulty.
+
+    Each bitmap is a Python int with bit `prompt_id` set, so combining filters
+    is a bitwise AND and counting hits is a popcount. Sort keys for the
+    INDEXED_SORTS are kept in ascending lists so a filtered page is found
+    without touching the database; only the final page is hydrated.
+
+    The snapshot is tagged with the catalog version it reflects and kept
+    current by a CatalogSnapshot: the writing worker applies its own changes
+    in place; other workers reload in the background when they see a newer
+    version.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = None
+        self.bitmaps = {}
+        self.all = 0
+        self.records = {}
+        self.sort_keys = {sort_key: [] for sort_key in INDEXED_SORTS}
+
+    @property
+    def loaded(self):
+        return self.version is not None
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def _record_keys(record):
+        category_id, difficulty, tag_ids, _, _ = record
+        keys = [('category', category_id), ('difficulty', difficulty)]
+        keys += [('tag', tag_id) for tag_id in tag_ids]
+        return keys
+
+    @staticmethod
+    def _sort_values(record):
+        _, _, _, created_at, rating = record
+        return {'newest': created_at, 'rating': rating if rating is not None else 0.0}
+
+    def load(self, version, rows, tag_rows):
+        """Replace the snapshot from (id, category_id, difficulty, created_at, rating) and (prompt_id, tag_id) rows"""
+        tags = defaultdict(list)
+        for prompt_id, tag_id in tag_rows:
+            tags[prompt_id].append(tag_id)
+
+        members = defaultdict(list)
+        records = {}
+        for prompt_id, category_id, difficulty, created_at, rating in rows:
+            record = (category_id, difficulty, frozenset(tags.get(prompt_id, ())), created_at, rating)
+            records[prompt_id] = record
+            for key in self._record_keys(record):
+                members[key].append(prompt_id)
+
+        sort_keys = {
+            sort_key: sorted((self._sort_values(record)[sort_key], prompt_id)
+                             for prompt_id, record in records.items())
+            for sort_key in INDEXED_SORTS
+        }
+
+        with self._lock:
+            self.records = records
+            self.bitmaps = {key: _bitmap(prompt_ids) for key, prompt_ids in members.items()}
+            self.all = _bitmap(records)
+            self.sort_keys = sort_keys
+            self.version = version
+
+    def add(self, prompt_id, category_id, difficulty, tag_ids, created_at, rating):
+        """Insert or replace one prompt"""
+        with self._lock:
+            self.remove(prompt_id)
+            record = (category_id, difficulty, frozenset(tag_ids), created_at, rating)
+            bit = 1 << prompt_id
+            for key in self._record_keys(record):
+                self.bitmaps[key] = self.bitmaps.get(key, 0) | bit
+            self.all |= bit
+            for sort_key, value in self._sort_values(record).items():
+                insort(self.sort_keys[sort_key], (value, prompt_id))
+            self.records[prompt_id] = record
+
+    def remove(self, prompt_id):
+        with self._lock:
+            record = self.records.pop(prompt_id, None)
+            if record is None:
+                return
+            bit = 1 << prompt_id
+            for key in self._record_keys(record):
+                self.bitmaps[key] = self.bitmaps.get(key, 0) & ~bit
+            self.all &= ~bit
+            for sort_key, value in self._sort_values(record).items():
+                keys = self.sort_keys[sort_key]
+                position = bisect_left(keys, (value, prompt_id))
+                if position < len(keys) and keys[position] == (value, prompt_id):
+                    del keys[position]
+
+    def match(self, category_id=None, tag_id=None, difficulty=None):
+        """Bitmap of prompts passing every given filter"""
+        mask = self.all
+        if category_id is not None:
+            mask &= self.bitmaps.get(('category', category_id), 0)
+        if tag_id is not None:
+            mask &= self.bitmaps.get(('tag', tag_id), 0)
+        if difficulty is not None:
+            mask &= self.bitmaps.get(('difficulty', difficulty), 0)
+        return mask
+
+    def facets(self, mask):
+        """Same shape as facets.compute_facets, from popcounts of the intersections"""
+        facets = {'total': mask.bit_count(), 'categories': {}, 'tags': {}, 'difficulties': {}}
+        groups = {'category': 'categories', 'tag': 'tags', 'difficulty': 'difficulties'}
+        for (kind, value), bitmap in self.bitmaps.items():
+            hits = (mask & bitmap).bit_count()
+            if hits and value is not None:
+                facets[groups[kind]][value] = hits
+        return facets
+
+    def page(self, mask, sort_key, cursor=None, per_page=24):
+        """One keyset page of matching ids in descending sort order.
+
+        Cursors are interchangeable with those of pagination.paginate for the
+        same sort. Returns (ids, next_cursor, prev_cursor).
+        """
+        direction, values = 'next', None
+        if cursor:
+            direction, values = decode_cursor(cursor, sort_key, 2)
+
+        members = PromptBits(mask)
+        with self._lock:
+            keys = self.sort_keys[sort_key]
+            if direction == 'next':
+                start = bisect_left(keys, tuple(values)) - 1 if values else len(keys) - 1
+                positions = range(start, -1, -1)
+            else:
+                positions = range(bisect_right(keys, tuple(values)), len(keys))
+
+            found = []
+            for position in positions:
+                if keys[position][1] in members:
+                    found.append(keys[position])
+                    if len(found) > per_page:
+                        break
+
+        has_more = len(found) > per_page
+        found = found[:per_page]
+        if direction == 'prev':
+            found.reverse()
+
+        has_next = has_more if direction == 'next' else values is not None
+        has_prev = values is not None if direction == 'next' else has_more
+        next_cursor = encode_cursor(sort_key, 'next', found[-1]) if found and has_next else None
+        prev_cursor = encode_cursor(sort_key, 'prev', found[0]) if found and has_prev else None
+        return [prompt_id for _, prompt_id in found], next_cursor, prev_cursor
+
+filter_index = FilterIndex()
+
+def load_filter_index(version):
+    from app import db
+    from app.models import Prompt, prompt_tags
+
+    rows = Prompt.query.with_entities(
+        Prompt.id, Prompt.category_id, Prompt.difficulty, Prompt.created_at, Prompt.rating
+    ).yield_per(5000)
+    tag_rows = db.session.query(prompt_tags.c.prompt_id, prompt_tags.c.tag_id).yield_per(5000)
+    filter_index.load(version, rows, tag_rows)
+
+snapshot = CatalogSnapshot('filter index', filter_index, load_filter_index)
+
+def get_filter_index():
+    """The process-wide filter index, reloaded when the catalog version changes"""
+    return snapshot.get()
+
+def index_prompt(prompt):
+    """Apply a committed prompt create/update to the loaded index"""
+    tag_ids = [tag.id for tag in prompt.tags]
+    snapshot.apply(lambda index: index.add(prompt.id, prompt.category_id, prompt.difficulty,
+                                           tag_ids, prompt.created_at, prompt.rating))
+
+def unindex_prompt(prompt_id):
+    """Apply a committed prompt delete to the loaded index"""
+    snapshot.apply(lambda index: index.remove(prompt_id))
@@ -0,0 +1,182 @@
+import re
+from flask import current_app
+from sqlalchemy import text, func, literal_column, or_, select, table, column
+from app import db
+
+FTS_TABLE = 'prompts_fts'
+SEARCH_COLUMNS = ['title', 'description', 'content', 'use_case']
+
+# Column weights used for relevance ranking (title > description > use_case > content)
+SQLITE_BM25_WEIGHTS = [10.0, 5.0, 1.0, 2.0]
+POSTGRES_WEIGHTS = {'title': 'A', 'description': 'B', 'content': 'D', 'use_case': 'C'}
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content, use_case,
+        content='prompts', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON prompts BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, content, use_case)
+        VALUES (new.id, new.title, new.description, new.content, new.use_case);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON prompts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content, use_case)
+        VALUES ('delete', old.id, old.title, old.description, old.content, old.use_case);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, description, content, use_case ON prompts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, content, use_case)
+        VALUES ('delete', old.id, old.title, old.description, old.content, old.use_case);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, content, use_case)
+        VALUES (new.id, new.title, new.description, new.content, new.use_case);
+    END
+    """,
+]
+
+def _postgres_vector_sql():
+    parts = [
+        f"setweight(to_tsvector('english', coalesce({name}, '')), '{weight}')"
+        for name, weight in POSTGRES_WEIGHTS.items()
+    ]
+    return ' || '.join(parts)
+
+POSTGRES_FTS_DDL = [
+    f"""
+    ALTER TABLE prompts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS ({_postgres_vector_sql()}) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_prompts_search_vector ON prompts USING GIN (search_vector)",
+]
+
+def tokenize_query(search_query):
+    """Split a user search string into safe word tokens"""
+    return TOKEN_PATTERN.findall(search_query.lower()) if search_query else []
+
+def _sqlite_ready(connection):
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first() is not None
+
+def _postgres_ready(connection):
+    return connection.execute(
+        text("SELECT 1 FROM information_schema.columns "
+             "WHERE table_name = 'prompts' AND column_name = 'search_vector'")
+    ).first() is not None
+
+def _setup_sqlite(connection):
+    exists = _sqlite_ready(connection)
+
+    # Every statement is IF NOT EXISTS, so workers starting together can all run them
+    for statement in SQLITE_FTS_DDL:
+        connection.execute(text(statement))
+
+    # Index rows that were inserted before the FTS table existed (idempotent)
+    if not exists:
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+def _setup_postgres(connection):
+    for statement in POSTGRES_FTS_DDL:
+        connection.execute(text(statement))
+
+FULLTEXT_SETUP = {
+    'sqlite': (_setup_sqlite, _sqlite_ready),
+    'postgresql': (_setup_postgres, _postgres_ready),
+}
+
+def setup_fulltext(app):
+    """Create the full-text index for the configured database and record the backend.
+
+    The backend is chosen by whether the index exists afterwards, not by
+    whether this process's DDL succeeded: when several workers start at
+    once, the one that loses a race still uses the index the winner built.
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in FULLTEXT_SETUP:
+        app.config['FULLTEXT_BACKEND'] = 'like'
+        return 'like'
+    setup, ready = FULLTEXT_SETUP[dialect]
+
+    try:
+        with db.engine.begin() as connection:
+            setup(connection)
+    except Exception as e:
+        app.logger.warning(f"Full-text index setup failed: {e}")
+
+    try:
+        with db.engine.connect() as connection:
+            backend = dialect if ready(connection) else 'like'
+    except Exception as e:
+        app.logger.warning(f"Full-text index check failed: {e}")
+        backend = 'like'
+    if backend == 'like':
+        app.logger.warning("Full-text index unavailable, falling back to LIKE search")
+
+    app.config['FULLTEXT_BACKEND'] = backend
+    return backend
+
+def rebuild_fulltext_index():
+    """Re-index every prompt (SQLite only; Postgres keeps a generated column)"""
+    if current_app.config.get('FULLTEXT_BACKEND') == 'sqlite':
+        db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+
+def _like_search(query, search_query):
+    from app.models import Prompt
+
+    search_pattern = f'%{search_query}%'
+    return query.filter(
+        or_(
+            Prompt.title.ilike(search_pattern),
+            Prompt.description.ilike(search_pattern),
+            Prompt.content.ilike(search_pattern),
+            Prompt.use_case.ilike(search_pattern)
+        )
+    ), None
+
+def _sqlite_search(query, tokens):
+    from app.models import Prompt
+
+    fts = table(FTS_TABLE, column('rowid'))
+    fts_ref = literal_column(FTS_TABLE)
+    match_expr = ' '.join(f'"{token}"*' for token in tokens)
+
+    matches = select(
+        fts.c.rowid.label('prompt_id'),
+        func.bm25(fts_ref, *SQLITE_BM25_WEIGHTS).label('rank')
+    ).select_from(fts).where(fts_ref.op('MATCH')(match_expr)).subquery()
+
+    query = query.join(matches, matches.c.prompt_id == Prompt.id)
+    # bm25() already returns lower-is-better scores
+    return query, matches.c.rank
+
+def _postgres_search(query, tokens):
+    ts_query = func.to_tsquery('english', ' & '.join(f'{token}:*' for token in tokens))
+    search_vector = literal_column('prompts.search_vector')
+
+    query = query.filter(search_vector.op('@@')(ts_query))
+    return query, -func.ts_rank_cd(search_vector, ts_query)
+
+def apply_search(query, search_query):
+    """Filter a Prompt query by search text.
+
+    Returns the filtered query and a rank expression where lower values are
+    more relevant (None when the active backend cannot rank).
+    """
+    backend = current_app.config.get('FULLTEXT_BACKEND', 'like')
+    tokens = tokenize_query(search_query)
+
+    if backend == 'like' or not tokens:
+        return _like_search(query, search_query)
+    if backend == 'sqlite':
+        return _sqlite_search(query, tokens)
+    return _postgres_search(query, tokens)
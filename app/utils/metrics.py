@@ -0,0 +1,136 @@
+import hmac
+import os
+import time
+from flask import Response, abort, g, request, has_request_context
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Set in the environment before the workers start (see gunicorn.conf.py) so every
+# worker writes its samples to files there and /metrics sums them
+MULTIPROCESS_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+REQUEST_LATENCY = Histogram(
+    'promptkhajana_request_duration_seconds', 'Request latency by endpoint', ['endpoint', 'method']
+)
+REQUESTS = Counter(
+    'promptkhajana_requests_total', 'Requests by endpoint and status', ['endpoint', 'method', 'status']
+)
+DB_QUERIES = Counter(
+    'promptkhajana_db_queries_total', 'SQL statements executed, by endpoint', ['endpoint']
+)
+DB_POOL_CHECKOUT = Histogram(
+    'promptkhajana_db_pool_checkout_seconds', 'Time to get a connection from the pool, waiting or connecting',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+CACHE_LOOKUPS = Counter(
+    'promptkhajana_cache_lookups_total', 'Cache lookups by cache and result (hit/miss)', ['cache', 'result']
+)
+OTP_EMAILS = Counter(
+    'promptkhajana_otp_emails_total', 'OTP emails by purpose and result (sent/failed)', ['purpose', 'result']
+)
+SMTP_CONNECTIONS = Counter(
+    'promptkhajana_smtp_connections_total', 'SMTP sessions opened (connect, STARTTLS and login)'
+)
+VIEW_BACKLOG = Gauge(
+    'promptkhajana_view_counter_pending', 'Buffered prompt views not yet written to the database',
+    multiprocess_mode='livesum'
+)
+
+def record_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+def record_otp_email(purpose, sent):
+    OTP_EMAILS.labels(purpose, 'sent' if sent else 'failed').inc()
+
+def record_smtp_connect():
+    SMTP_CONNECTIONS.inc()
+
+def _endpoint():
+    if not has_request_context():
+        return 'background'
+    return request.endpoint or 'unmatched'
+
+def instrument_pool(pool):
+    """Time every checkout from `pool`, including the wait for a free connection"""
+    if getattr(pool, '_metrics_instrumented', False):
+        return
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+    pool._metrics_instrumented = True
+
+def render_metrics():
+    """Metrics in Prometheus text format, summed over all workers in multiprocess mode"""
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+class Metrics:
+    """Prometheus metrics for requests, the database, caches, OTP email and view counts.
+
+    Off unless METRICS_ENABLED is set. Serves them at /metrics, which
+    requires `Authorization: Bearer <METRICS_TOKEN>` when a token is
+    configured. With PROMETHEUS_MULTIPROC_DIR set, samples from every
+    gunicorn worker are aggregated through that shared directory.
+    """
+
+    _engine_hooked = False
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.token = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        self.token = app.config.get('METRICS_TOKEN')
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self._serve)
+
+        if not Metrics._engine_hooked:
+            event.listen(Engine, 'before_cursor_execute', _count_query)
+            Metrics._engine_hooked = True
+
+        from app import db
+        with app.app_context():
+            instrument_pool(db.engine.pool)
+
+    def _serve(self):
+        if self.token:
+            supplied = request.headers.get('Authorization', '').encode()
+            if not hmac.compare_digest(supplied, f'Bearer {self.token}'.encode()):
+                abort(401)
+        return render_metrics()
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None or request.endpoint == 'metrics':
+            return response
+        endpoint = _endpoint()
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        return response
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES.labels(_endpoint()).inc()
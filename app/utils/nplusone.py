@@ -0,0 +1,99 @@
+import os
+import sys
+from collections import Counter
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.perf import normalize_statement
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(APP_ROOT)
+
+class NPlusOneError(RuntimeError):
+    pass
+
+def _relative(path):
+    return os.path.relpath(path, PROJECT_ROOT) if path.startswith(PROJECT_ROOT) else path
+
+def find_origin():
+    """Innermost template line or app source line on the current stack"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            lineno = template.get_corresponding_lineno(frame.f_lineno)
+            return f'{_relative(template.filename or template.name)}:{lineno}'
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and filename != __file__:
+            return f'{_relative(filename)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+class NPlusOneDetector:
+    """Opt-in detector for statements repeated within one request.
+
+    SQL emitted while handling a request is grouped by normalized shape (see
+    perf.normalize_statement); a shape executed NPLUSONE_THRESHOLD times or
+    more is reported with the template or code line that issued it. Meant
+    for development and test runs: with NPLUSONE_RAISE the request fails with
+    NPlusOneError instead of only logging.
+    """
+
+    _engine_hooked = False
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.threshold = 5
+        self.raise_errors = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('NPLUSONE_DETECT', False)
+        self.threshold = app.config.get('NPLUSONE_THRESHOLD', self.threshold)
+        self.raise_errors = app.config.get('NPLUSONE_RAISE', False)
+        app.extensions['nplusone'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+        if not NPlusOneDetector._engine_hooked:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            NPlusOneDetector._engine_hooked = True
+
+    def _start_request(self):
+        g.nplusone = {'threshold': self.threshold, 'counts': Counter(), 'origins': {}}
+
+    def _finish_request(self, response):
+        state = g.pop('nplusone', None)
+        if state is None:
+            return response
+
+        detections = detections_from(state)
+        for shape, count, origin in detections:
+            current_app.logger.warning(
+                f"N+1 query in {request.endpoint}: {count} executions from {origin}: {shape[:300]}"
+            )
+        if detections and self.raise_errors:
+            shape, count, origin = detections[0]
+            raise NPlusOneError(f"{request.endpoint} ran {count} times from {origin}: {shape}")
+        return response
+
+def detections_from(state):
+    """(shape, count, origin) for every shape over the threshold, most repeated first"""
+    return [
+        (shape, count, state['origins'].get(shape, 'unknown'))
+        for shape, count in state['counts'].most_common()
+        if count >= state['threshold']
+    ]
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    state = g.get('nplusone') if has_request_context() else None
+    if state is None:
+        return
+    shape = normalize_statement(statement)
+    state['counts'][shape] += 1
+    if state['counts'][shape] == state['threshold']:
+        state['origins'][shape] = find_origin()
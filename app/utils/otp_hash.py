@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+import secrets
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HMACHasher:
+    """HMAC-SHA256 keyed with a server secret, with a per-code salt.
+
+    A password KDF is unnecessary here: codes live OTP_EXPIRY_MINUTES, are
+    attempt-limited, and without the secret a leaked hash cannot be checked
+    against the 10^6 possible codes offline.
+    """
+
+    name = 'hmac'
+    prefix = 'hmac-sha256$'
+
+    def __init__(self, secret):
+        if not secret:
+            raise ValueError("HMAC OTP hashing needs OTP_SECRET or SECRET_KEY")
+        self.key = secret.encode() if isinstance(secret, str) else secret
+
+    def _digest(self, salt, code):
+        return hmac.new(self.key, f'{salt}${code}'.encode(), hashlib.sha256).hexdigest()
+
+    def hash(self, code):
+        salt = secrets.token_hex(8)
+        return f'{self.prefix}{salt}${self._digest(salt, code)}'
+
+    def verify(self, stored, code):
+        try:
+            salt, digest = stored[len(self.prefix):].split('$', 1)
+        except ValueError:
+            return False
+        return hmac.compare_digest(digest, self._digest(salt, code))
+
+class WerkzeugHasher:
+    """werkzeug's password hashing (pbkdf2/scrypt), used for OTPs before HMAC"""
+
+    name = 'werkzeug'
+    prefixes = ('pbkdf2:', 'scrypt:')
+
+    def hash(self, code):
+        return generate_password_hash(code)
+
+    def verify(self, stored, code):
+        return check_password_hash(stored, code)
+
+class OTPHasher:
+    """Hashes new codes with OTP_HASHER and verifies codes in any known format.
+
+    The stored format is told apart by prefix, so rows written by another
+    hasher (e.g. werkzeug hashes from before HMAC was the default) keep
+    verifying until they expire.
+    """
+
+    def __init__(self, app=None):
+        self.hasher = None
+        self.hmac = None
+        self.werkzeug = WerkzeugHasher()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.hmac = HMACHasher(app.config.get('OTP_SECRET') or app.config['SECRET_KEY'])
+        name = app.config.get('OTP_HASHER', 'hmac')
+        if name == 'hmac':
+            self.hasher = self.hmac
+        elif name == 'werkzeug':
+            self.hasher = self.werkzeug
+        else:
+            raise ValueError(f"Unknown OTP_HASHER: {name}")
+        app.extensions['otp_hasher'] = self
+
+    def hash(self, code):
+        return self.hasher.hash(str(code))
+
+    def verify(self, stored, code):
+        if not stored:
+            return False
+        if stored.startswith(HMACHasher.prefix):
+            return self.hmac.verify(stored, str(code))
+        if stored.startswith(WerkzeugHasher.prefixes):
+            return self.werkzeug.verify(stored, str(code))
+        return False
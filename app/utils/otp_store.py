@@ -0,0 +1,183 @@
+import abc
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+
+# Outcomes of OtpStore.verify
+VERIFIED = 'verified'
+MISSING = 'missing'
+EXPIRED = 'expired'
+LOCKED = 'locked'
+INVALID = 'invalid'
+
+class OtpStore(abc.ABC):
+    """Pending one-time codes, one per (email, purpose).
+
+    Stores keep only the hash; `check` passed to `verify` compares it with
+    the submitted code. Every verification counts as an attempt, and a code
+    is consumed by its first successful verification.
+    """
+
+    @abc.abstractmethod
+    def issue(self, email, purpose, otp_hash, ttl):
+        """Store a code valid for `ttl` seconds, replacing any pending one"""
+
+    @abc.abstractmethod
+    def verify(self, email, purpose, check, max_attempts):
+        """One of VERIFIED, MISSING, EXPIRED, LOCKED or INVALID"""
+
+    def cleanup(self):
+        """Drop expired codes (stores with native expiry have nothing to do)"""
+
+class SQLOtpStore(OtpStore):
+    """The `otps` table; every issue and verification is a database write"""
+
+    def issue(self, email, purpose, otp_hash, ttl):
+        from app import db
+        from app.models import OTP
+
+        OTP.query.filter_by(email=email, purpose=purpose, is_used=False).delete()
+        db.session.add(OTP(email=email, purpose=purpose, otp_hash=otp_hash,
+                           expires_at=datetime.utcnow() + timedelta(seconds=ttl)))
+        db.session.commit()
+
+    def verify(self, email, purpose, check, max_attempts):
+        from app.models import OTP
+
+        otp_record = OTP.query.filter_by(
+            email=email,
+            purpose=purpose,
+            is_used=False
+        ).order_by(OTP.created_at.desc()).first()
+
+        if not otp_record:
+            return MISSING
+        if otp_record.is_expired():
+            return EXPIRED
+        if otp_record.attempts >= max_attempts:
+            return LOCKED
+
+        otp_record.increment_attempts()
+        if check(otp_record.otp_hash):
+            otp_record.mark_as_used()
+            return VERIFIED
+        return INVALID
+
+    def cleanup(self):
+        from app import db
+        from app.models import OTP
+
+        OTP.query.filter(OTP.expires_at < datetime.utcnow()).delete()
+        db.session.commit()
+
+class MemoryOtpStore(OtpStore):
+    """Per-process dict with expiry times.
+
+    Codes are only visible to the process that issued them, so this suits
+    deployments with a single worker process (threads are fine).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes = {}
+
+    def issue(self, email, purpose, otp_hash, ttl):
+        with self._lock:
+            self._codes[(email, purpose)] = {'hash': otp_hash, 'expires_at': time.time() + ttl, 'attempts': 0}
+
+    def verify(self, email, purpose, check, max_attempts):
+        key = (email, purpose)
+        with self._lock:
+            entry = self._codes.get(key)
+            if entry is None:
+                return MISSING
+            if entry['expires_at'] < time.time():
+                del self._codes[key]
+                return EXPIRED
+            if entry['attempts'] >= max_attempts:
+                return LOCKED
+            entry['attempts'] += 1
+            if check(entry['hash']):
+                del self._codes[key]
+                return VERIFIED
+            return INVALID
+
+    def cleanup(self):
+        now = time.time()
+        with self._lock:
+            for key in [key for key, entry in self._codes.items() if entry['expires_at'] < now]:
+                del self._codes[key]
+
+class RedisOtpStore(OtpStore):
+    """Any server speaking the Redis protocol; codes are hashes with a key TTL.
+
+    Verification runs as an optimistic transaction (WATCH/MULTI), so
+    concurrent attempts are all counted and a code verifies at most once.
+    An expired code has simply disappeared and reports MISSING.
+    """
+
+    def __init__(self, url=None, prefix='promptkhajana:otp:', client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("OTP_STORE=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, email, purpose):
+        return f'{self.prefix}{purpose}:{email}'
+
+    def issue(self, email, purpose, otp_hash, ttl):
+        key = self._key(email, purpose)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping={'hash': otp_hash, 'attempts': 0})
+        pipe.expire(key, max(1, int(ttl)))
+        pipe.execute()
+
+    def verify(self, email, purpose, check, max_attempts):
+        from redis.exceptions import WatchError
+
+        key = self._key(email, purpose)
+        with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    entry = pipe.hgetall(key)
+                    if not entry:
+                        pipe.unwatch()
+                        return MISSING
+                    if int(entry[b'attempts']) >= max_attempts:
+                        pipe.unwatch()
+                        return LOCKED
+                    verified = check(entry[b'hash'].decode())
+                    pipe.multi()
+                    if verified:
+                        pipe.delete(key)
+                    else:
+                        pipe.hincrby(key, 'attempts', 1)
+                    pipe.execute()
+                    return VERIFIED if verified else INVALID
+                except WatchError:
+                    # Another attempt or a new code got in first; look again
+                    continue
+
+def create_otp_store(app):
+    """Build the store named by OTP_STORE and register it on the app"""
+    backend = app.config.get('OTP_STORE', 'sql')
+    if backend == 'sql':
+        store = SQLOtpStore()
+    elif backend == 'memory':
+        store = MemoryOtpStore()
+    elif backend == 'redis':
+        store = RedisOtpStore(app.config['OTP_STORE_URL'])
+    else:
+        raise ValueError(f"Unknown OTP_STORE: {backend}")
+    app.extensions['otp_store'] = store
+    return store
+
+def get_otp_store():
+    return current_app.extensions['otp_store']
@@ -0,0 +1,217 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import update
+
+STATUS_PENDING = 'pending'
+STATUS_SENDING = 'sending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+class EmailOutbox:
+    """Durable email queue in the `email_outbox` table with background delivery.
+
+    Request handlers only insert a row (`enqueue`). Each process runs
+    EMAIL_OUTBOX_WORKERS delivery threads, started lazily so every forked
+    gunicorn worker gets its own. The threads claim due rows with a
+    conditional UPDATE, which is safe across processes, and send them. A
+    failed send is retried after an exponential backoff with jitter until
+    EMAIL_MAX_ATTEMPTS is reached. Rows stuck in 'sending' by a crashed
+    process are reclaimed after EMAIL_LOCK_TIMEOUT seconds.
+
+    Message bodies may carry one-time codes, so they are cleared once a row
+    is sent or has failed for good.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.workers = 2
+        self.max_attempts = 5
+        self.backoff = 5
+        self.max_backoff = 600
+        self.poll_interval = 2
+        self.lock_timeout = 300
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._threads_pid = None
+        self._last_reclaim = None
+        self.sent = 0
+        self.failed_attempts = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get('EMAIL_OUTBOX_WORKERS', self.workers)
+        self.max_attempts = app.config.get('EMAIL_MAX_ATTEMPTS', self.max_attempts)
+        self.backoff = app.config.get('EMAIL_RETRY_BACKOFF', self.backoff)
+        self.poll_interval = app.config.get('EMAIL_POLL_INTERVAL', self.poll_interval)
+        self.lock_timeout = app.config.get('EMAIL_LOCK_TIMEOUT', self.lock_timeout)
+        app.extensions['email_outbox'] = self
+        # Every worker process starts its delivery threads with its first request
+        app.before_request(self._ensure_workers)
+
+    def enqueue(self, recipient, subject, html_body=None, text_body=None, kind='otp', purpose=None):
+        """Queue a message for delivery; commits and returns the outbox row"""
+        from app import db
+        from app.models import OutboxEmail
+
+        email = OutboxEmail(recipient=recipient, subject=subject, html_body=html_body, text_body=text_body,
+                            kind=kind, purpose=purpose, next_attempt_at=datetime.utcnow())
+        db.session.add(email)
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self._ensure_workers()
+        self._wakeup.set()
+        return email
+
+    def retry_delay(self, attempts):
+        """Seconds before attempt number `attempts + 1`: exponential, capped, with jitter"""
+        delay = min(self.max_backoff, self.backoff * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _reclaim_stale(self, now):
+        """Put messages left in 'sending' by a dead process back in the queue"""
+        from app import db
+        from app.models import OutboxEmail
+
+        # At most once per lock_timeout, and only written when something is stuck
+        with self._lock:
+            if self._last_reclaim is not None and now - self._last_reclaim < timedelta(seconds=self.lock_timeout):
+                return
+            self._last_reclaim = now
+
+        stale_before = now - timedelta(seconds=self.lock_timeout)
+        stale = db.session.query(OutboxEmail.id) \
+            .filter(OutboxEmail.status == STATUS_SENDING, OutboxEmail.locked_at < stale_before) \
+            .first()
+        if stale is None:
+            return
+        outbox = OutboxEmail.__table__
+        db.session.execute(
+            update(outbox)
+            .where(outbox.c.status == STATUS_SENDING, outbox.c.locked_at < stale_before)
+            .values(status=STATUS_PENDING)
+        )
+        db.session.commit()
+
+    def _claim(self):
+        """Atomically take one due message; returns its id or None.
+
+        An empty queue costs one SELECT; nothing is written unless a message is due.
+        """
+        from app import db
+        from app.models import OutboxEmail
+
+        now = datetime.utcnow()
+        outbox = OutboxEmail.__table__
+        self._reclaim_stale(now)
+
+        candidates = db.session.query(OutboxEmail.id) \
+            .filter(OutboxEmail.status == STATUS_PENDING, OutboxEmail.next_attempt_at <= now) \
+            .order_by(OutboxEmail.next_attempt_at).limit(5).all()
+        for (email_id,) in candidates:
+            claimed = db.session.execute(
+                update(outbox)
+                .where(outbox.c.id == email_id, outbox.c.status == STATUS_PENDING)
+                .values(status=STATUS_SENDING, locked_at=now)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return email_id
+        # Ends the read-only transaction; nothing was written
+        db.session.rollback()
+        return None
+
+    def _deliver(self, email_id):
+        from flask_mail import Message
+        from app import db, smtp_pool
+        from app.models import OutboxEmail
+        from app.utils.metrics import record_otp_email
+
+        email = db.session.get(OutboxEmail, email_id)
+        try:
+            smtp_pool.send(Message(subject=email.subject, recipients=[email.recipient],
+                              html=email.html_body, body=email.text_body))
+        except Exception as e:
+            email.attempts += 1
+            email.last_error = str(e)[:500]
+            email.locked_at = None
+            if email.attempts >= self.max_attempts:
+                email.status = STATUS_FAILED
+                email.html_body = email.text_body = None
+                if email.kind == 'otp':
+                    record_otp_email(email.purpose, sent=False)
+            else:
+                email.status = STATUS_PENDING
+                email.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.retry_delay(email.attempts))
+            db.session.commit()
+            self.failed_attempts += 1
+            self.app.logger.warning(f"Email {email_id} to {email.recipient} failed "
+                                    f"(attempt {email.attempts}/{self.max_attempts}): {e}")
+            return False
+
+        email.attempts += 1
+        email.status = STATUS_SENT
+        email.sent_at = datetime.utcnow()
+        email.locked_at = None
+        email.last_error = None
+        email.html_body = email.text_body = None
+        db.session.commit()
+        self.sent += 1
+        if email.kind == 'otp':
+            record_otp_email(email.purpose, sent=True)
+        return True
+
+    def process(self, limit=None):
+        """Deliver due messages until none are left (or `limit` were handled); returns the count"""
+        from app import db
+
+        handled = 0
+        with self.app.app_context():
+            try:
+                while limit is None or handled < limit:
+                    email_id = self._claim()
+                    if email_id is None:
+                        break
+                    self._deliver(email_id)
+                    handled += 1
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f"Email outbox processing failed: {e}")
+        return handled
+
+    def _ensure_workers(self):
+        if self.workers <= 0 or self.app is None:
+            return
+        if self._threads_pid == os.getpid() and len(self._threads) == self.workers \
+                and all(thread.is_alive() for thread in self._threads):
+            return
+        with self._lock:
+            if self._threads_pid != os.getpid():
+                # Threads do not survive a fork; this process needs its own
+                self._threads = []
+                self._threads_pid = os.getpid()
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f'email-outbox-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            self.process()
+
+    def run_forever(self):
+        """Foreground delivery loop for a dedicated worker process"""
+        while True:
+            if not self.process():
+                time.sleep(self.poll_interval)
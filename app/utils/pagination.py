@@ -0,0 +1,146 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PER_PAGE = 24
+MAX_PER_PAGE = 100
+
+# Kind of each cursor value per sort, in the order of main.get_sort_order
+CURSOR_VALUE_TYPES = {
+    'newest': ('datetime', 'id'),
+    'popular': ('number', 'id'),
+    'rating': ('number', 'id'),
+    'relevance': ('number', 'datetime', 'id'),
+}
+
+class InvalidCursor(ValueError):
+    pass
+
+class Page:
+    """One keyset page of results plus opaque cursors for its neighbours"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+def _is_kind(value, kind):
+    if isinstance(value, bool):
+        return False
+    if kind == 'datetime':
+        # Timestamps are stored as naive UTC; an aware one cannot be compared with them
+        return isinstance(value, datetime) and value.tzinfo is None
+    if kind == 'number':
+        return isinstance(value, (int, float))
+    return isinstance(value, int)
+
+def encode_cursor(sort_key, direction, values):
+    payload = json.dumps({
+        's': sort_key,
+        'd': direction,
+        'v': [_encode_value(value) for value in values]
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, sort_key, width):
+    """Decode a cursor token into (direction, values) for the given sort"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload['d']
+        values = [_decode_value(value) for value in payload['v']]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}")
+
+    if payload.get('s') != sort_key or direction not in ('next', 'prev') or len(values) != width:
+        raise InvalidCursor("Cursor does not match the requested ordering")
+    # Values are bound as SQL parameters and compared with index keys; anything
+    # but the sort's own types (a list, a string where a date belongs) is rejected
+    kinds = CURSOR_VALUE_TYPES.get(sort_key, ('number',) * (width - 1) + ('id',))
+    if len(kinds) != width or not all(_is_kind(value, kind) for value, kind in zip(values, kinds)):
+        raise InvalidCursor("Cursor values do not match the requested ordering")
+    return direction, values
+
+def _after(order, values):
+    """WHERE clause selecting rows strictly after `values` in `order`.
+
+    Emits `a <= :a AND (a < :a OR (a = :a AND b < :b) ...)` so the leading
+    column can still drive an index range scan.
+    """
+    clauses = []
+    for position, ((column, descending), value) in enumerate(zip(order, values)):
+        strictly = column < value if descending else column > value
+        ties = [prior == prior_value for (prior, _), prior_value in zip(order[:position], values)]
+        clauses.append(and_(*ties, strictly) if ties else strictly)
+
+    leading, descending = order[0]
+    bound = leading <= values[0] if descending else leading >= values[0]
+    return and_(bound, or_(*clauses))
+
+def paginate(query, order, sort_key, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """Fetch one page of `query` using keyset pagination.
+
+    `order` is a list of (column expression, descending) pairs that must end
+    in a unique column (the primary key). The cost of a page is O(per_page)
+    regardless of its depth; OFFSET is never used.
+    """
+    direction, values = 'next', None
+    if cursor:
+        direction, values = decode_cursor(cursor, sort_key, len(order))
+
+    # Walking backwards flips every sort direction and reverses the result afterwards
+    scan = [(column, descending != (direction == 'prev')) for column, descending in order]
+    if values is not None:
+        query = query.filter(_after(scan, values))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in scan])
+    query = query.add_columns(*[column for column, _ in order])
+    rows = query.limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+
+    items = [row[0] for row in rows]
+    keys = [tuple(row[1:]) for row in rows]
+
+    has_next = has_more if direction == 'next' else values is not None
+    has_prev = values is not None if direction == 'next' else has_more
+
+    next_cursor = encode_cursor(sort_key, 'next', keys[-1]) if keys and has_next else None
+    prev_cursor = encode_cursor(sort_key, 'prev', keys[0]) if keys and has_prev else None
+    return Page(items, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+def get_per_page(value, default=DEFAULT_PER_PAGE):
+    """Parse a per-page request argument, clamped to MAX_PER_PAGE"""
+    try:
+        per_page = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(per_page, MAX_PER_PAGE))
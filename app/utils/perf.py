@@ -0,0 +1,202 @@
+import heapq
+import re
+import threading
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Slowest statements kept per request for the "slowest queries" table
+QUERIES_PER_RECORD = 5
+
+_WHITESPACE = re.compile(r'\s+')
+_PARAMETER_LIST = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)')
+
+def normalize_statement(statement):
+    """SQL text with whitespace collapsed and IN-lists folded, so one query shape groups together"""
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    return _PARAMETER_LIST.sub('(?, ...)', statement)
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+class PerfMonitor:
+    """Per-request timings kept in a fixed-size ring buffer.
+
+    Records SQL statement count and time (engine events), template render
+    time (Flask template signals), markdown render time (`timer('markdown')`)
+    and wall time for every request except static files. Streamed response
+    bodies are not included in the wall time.
+    """
+
+    _engine_hooked = False
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.records = deque(maxlen=1000)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PERF_MONITOR', True)
+        self.records = deque(maxlen=app.config.get('PERF_BUFFER_SIZE', 1000))
+        app.extensions['perf_monitor'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._template_started, app)
+        template_rendered.connect(self._template_finished, app)
+
+        if not PerfMonitor._engine_hooked:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+            PerfMonitor._engine_hooked = True
+
+    @staticmethod
+    def current():
+        """Timings of the request being handled, or None outside an instrumented request"""
+        return g.get('perf') if has_request_context() else None
+
+    @contextmanager
+    def timer(self, name):
+        """Add the time spent in the block to the current request's `<name>_ms`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            current = self.current()
+            if current is not None:
+                current[f'{name}_ms'] = current.get(f'{name}_ms', 0.0) + (time.perf_counter() - started) * 1000
+
+    def _start_request(self):
+        g.perf = {
+            'started': time.perf_counter(),
+            'sql_count': 0,
+            'sql_ms': 0.0,
+            'template_ms': 0.0,
+            'markdown_ms': 0.0,
+            'queries': [],
+            'template_stack': [],
+        }
+
+    def _template_started(self, sender, template, context, **extra):
+        current = self.current()
+        if current is not None:
+            current['template_stack'].append(time.perf_counter())
+
+    def _template_finished(self, sender, template, context, **extra):
+        current = self.current()
+        if current is not None and current['template_stack']:
+            started = current['template_stack'].pop()
+            # Only the outermost render counts, so nested renders are not added twice
+            if not current['template_stack']:
+                current['template_ms'] += (time.perf_counter() - started) * 1000
+
+    def _finish_request(self, response):
+        current = g.pop('perf', None)
+        if current is None or request.endpoint == 'static':
+            return response
+
+        queries = [(statement, elapsed) for elapsed, statement in sorted(current['queries'], reverse=True)]
+        record = {
+            'time': datetime.utcnow(),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint or '<unmatched>',
+            'status': response.status_code,
+            'wall_ms': (time.perf_counter() - current['started']) * 1000,
+            'sql_count': current['sql_count'],
+            'sql_ms': current['sql_ms'],
+            'template_ms': current['template_ms'],
+            'markdown_ms': current['markdown_ms'],
+            'queries': queries,
+        }
+        with self._lock:
+            self.records.append(record)
+        return response
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    def slowest_endpoints(self, limit=10):
+        """Per-endpoint aggregates over the buffer, slowest p95 first"""
+        groups = defaultdict(list)
+        for record in self.snapshot():
+            groups[record['endpoint']].append(record)
+
+        rows = []
+        for endpoint, records in groups.items():
+            walls = [record['wall_ms'] for record in records]
+            count = len(records)
+            rows.append({
+                'endpoint': endpoint,
+                'count': count,
+                'p50_ms': percentile(walls, 50),
+                'p95_ms': percentile(walls, 95),
+                'max_ms': max(walls),
+                'sql_count': sum(record['sql_count'] for record in records) / count,
+                'sql_ms': sum(record['sql_ms'] for record in records) / count,
+                'template_ms': sum(record['template_ms'] for record in records) / count,
+                'markdown_ms': sum(record['markdown_ms'] for record in records) / count,
+            })
+        rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return rows[:limit]
+
+    def slowest_queries(self, limit=10):
+        """Statements grouped by normalized shape, slowest single execution first"""
+        groups = {}
+        for record in self.snapshot():
+            for statement, elapsed in record['queries']:
+                group = groups.setdefault(statement, {
+                    'statement': statement, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'endpoints': set()
+                })
+                group['count'] += 1
+                group['total_ms'] += elapsed
+                group['max_ms'] = max(group['max_ms'], elapsed)
+                group['endpoints'].add(record['endpoint'])
+
+        rows = sorted(groups.values(), key=lambda group: group['max_ms'], reverse=True)[:limit]
+        for row in rows:
+            row['mean_ms'] = row['total_ms'] / row['count']
+            row['endpoints'] = sorted(row['endpoints'])
+        return rows
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if PerfMonitor.current() is not None:
+        conn.info.setdefault('perf_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = PerfMonitor.current()
+    started = conn.info.get('perf_started')
+    if current is None or not started:
+        return
+    elapsed = (time.perf_counter() - started.pop()) * 1000
+    current['sql_count'] += 1
+    current['sql_ms'] += elapsed
+
+    # Min-heap of the slowest statements; only those pay for normalization
+    queries = current['queries']
+    if len(queries) < QUERIES_PER_RECORD:
+        heapq.heappush(queries, (elapsed, normalize_statement(statement)))
+    elif elapsed > queries[0][0]:
+        heapq.heapreplace(queries, (elapsed, normalize_statement(statement)))
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    started = connection.info.get('perf_started') if connection is not None else None
+    if started:
+        started.pop()
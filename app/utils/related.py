@@ -0,0 +1,174 @@
+from sqlalchemy import func, or_
+from sqlalchemy.orm import load_only, selectinload
+from app import db
+from app.models import Prompt, RelatedPrompt, prompt_tags
+from app.utils.fulltext import tokenize_query
+
+# Neighbours stored per prompt (the detail page shows the first few)
+RELATED_TOP_K = 6
+
+# Upper bounds on prompts compared against when (re)computing one prompt
+MAX_TAG_CANDIDATES = 300
+MAX_CATEGORY_CANDIDATES = 50
+
+TAG_WEIGHT = 0.6
+TEXT_WEIGHT = 0.3
+CATEGORY_WEIGHT = 0.1
+
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'your', 'from', 'that', 'this', 'into', 'any',
+    'are', 'all', 'you', 'how', 'use', 'using', 'when', 'what', 'prompt', 'prompts',
+}
+
+def _terms(prompt):
+    text = f'{prompt.title or ""} {prompt.description or ""}'
+    return {term for term in tokenize_query(text) if len(term) > 2 and term not in STOPWORDS}
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def _profile(prompt):
+    return {
+        'category_id': prompt.category_id,
+        'tags': {tag.id for tag in prompt.tags},
+        'terms': _terms(prompt),
+    }
+
+def similarity(a, b):
+    """Relatedness of two prompt profiles in [0, 1]"""
+    score = TAG_WEIGHT * _jaccard(a['tags'], b['tags'])
+    score += TEXT_WEIGHT * _jaccard(a['terms'], b['terms'])
+    if a['category_id'] == b['category_id']:
+        score += CATEGORY_WEIGHT
+    return score
+
+def _candidate_ids(prompt, tag_ids):
+    candidate_ids = set()
+
+    if tag_ids:
+        shared = func.count(prompt_tags.c.tag_id)
+        rows = db.session.query(prompt_tags.c.prompt_id) \
+            .filter(prompt_tags.c.tag_id.in_(tag_ids), prompt_tags.c.prompt_id != prompt.id) \
+            .group_by(prompt_tags.c.prompt_id) \
+            .order_by(shared.desc()) \
+            .limit(MAX_TAG_CANDIDATES)
+        candidate_ids.update(row[0] for row in rows)
+
+    rows = db.session.query(Prompt.id) \
+        .filter(Prompt.category_id == prompt.category_id, Prompt.id != prompt.id) \
+        .order_by(Prompt.id.desc()) \
+        .limit(MAX_CATEGORY_CANDIDATES)
+    candidate_ids.update(row[0] for row in rows)
+
+    # Prompts currently listing this one must have their score refreshed too
+    rows = db.session.query(RelatedPrompt.prompt_id).filter(RelatedPrompt.related_id == prompt.id)
+    candidate_ids.update(row[0] for row in rows)
+    return candidate_ids
+
+def _load_profiles(prompt_ids):
+    if not prompt_ids:
+        return {}
+    prompts = Prompt.query.options(
+        load_only(Prompt.id, Prompt.title, Prompt.description, Prompt.category_id),
+        selectinload(Prompt.tags)
+    ).filter(Prompt.id.in_(prompt_ids)).all()
+    return {p.id: _profile(p) for p in prompts}
+
+def _neighbours(prompt_ids):
+    neighbours = {prompt_id: {} for prompt_id in prompt_ids}
+    if prompt_ids:
+        rows = RelatedPrompt.query.filter(RelatedPrompt.prompt_id.in_(prompt_ids))
+        for row in rows:
+            neighbours[row.prompt_id][row.related_id] = row
+    return neighbours
+
+def _store(prompt_id, scored, rows):
+    """Make the neighbour rows of prompt_id the top-K of {related_id: score}"""
+    ranked = sorted(scored.items(), key=lambda item: (-item[1], -item[0]))[:RELATED_TOP_K]
+    top = {related_id: score for related_id, score in ranked if score > 0}
+
+    for related_id, row in rows.items():
+        if related_id in top:
+            row.score = top.pop(related_id)
+        else:
+            db.session.delete(row)
+    for related_id, score in top.items():
+        db.session.add(RelatedPrompt(prompt_id=prompt_id, related_id=related_id, score=score))
+
+def refresh_related(prompt):
+    """Recompute the neighbours of a saved prompt and offer it to its candidates.
+
+    Costs a bounded number of comparisons (the tag and category candidate
+    limits) instead of touching the whole catalog. The caller commits.
+    """
+    profile = _profile(prompt)
+    candidate_ids = _candidate_ids(prompt, profile['tags'])
+    profiles = _load_profiles(candidate_ids)
+    scores = {candidate_id: similarity(profile, other) for candidate_id, other in profiles.items()}
+    neighbours = _neighbours([prompt.id] + list(profiles))
+
+    _store(prompt.id, scores, neighbours[prompt.id])
+
+    # Symmetric update: the prompt may now belong in a candidate's top-K, or drop out of it
+    for candidate_id in profiles:
+        rows = neighbours[candidate_id]
+        current = {related_id: row.score for related_id, row in rows.items()}
+        score = scores[candidate_id]
+        if prompt.id not in current and (score <= 0 or (
+                len(current) >= RELATED_TOP_K and score <= min(current.values()))):
+            continue
+        current[prompt.id] = score
+        _store(candidate_id, current, rows)
+
+def forget_related(prompt_id):
+    """Drop neighbour rows touching a prompt about to be deleted.
+
+    Returns ids of prompts that lost a neighbour and should be refreshed once
+    the deletion is committed.
+    """
+    affected = [row[0] for row in db.session.query(RelatedPrompt.prompt_id)
+                .filter(RelatedPrompt.related_id == prompt_id)]
+    RelatedPrompt.query.filter(or_(
+        RelatedPrompt.prompt_id == prompt_id,
+        RelatedPrompt.related_id == prompt_id
+    )).delete(synchronize_session=False)
+    return affected
+
+def refresh_related_ids(prompt_ids):
+    for prompt in Prompt.query.options(selectinload(Prompt.tags)).filter(Prompt.id.in_(prompt_ids)):
+        refresh_related(prompt)
+    db.session.commit()
+
+def rebuild_related(batch_size=200):
+    """Recompute neighbours for every prompt, committing per batch; returns prompts processed"""
+    count = 0
+    last_id = 0
+    while True:
+        batch = Prompt.query.options(selectinload(Prompt.tags)) \
+            .filter(Prompt.id > last_id).order_by(Prompt.id).limit(batch_size).all()
+        if not batch:
+            break
+        for prompt in batch:
+            refresh_related(prompt)
+        db.session.commit()
+        count += len(batch)
+        last_id = batch[-1].id
+    return count
+
+def get_related_prompts(prompt, limit=3):
+    """Precomputed neighbours of a prompt, best first, in one indexed lookup.
+
+    Prompts without stored neighbours (e.g. before `flask build-related` has
+    run) fall back to the newest prompts of the same category.
+    """
+    related_prompts = Prompt.query.join(RelatedPrompt, RelatedPrompt.related_id == Prompt.id) \
+        .filter(RelatedPrompt.prompt_id == prompt.id) \
+        .order_by(RelatedPrompt.score.desc(), Prompt.id.desc()) \
+        .limit(limit).all()
+    if related_prompts:
+        return related_prompts
+
+    return Prompt.query.filter(Prompt.category_id == prompt.category_id, Prompt.id != prompt.id) \
+        .order_by(Prompt.id.desc()).limit(limit).all()
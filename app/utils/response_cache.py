@@ -0,0 +1,221 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from flask import current_app
+from app.utils.cache import LRUCache
+from app.utils.metrics import record_cache_lookup
+
+class MemoryBackend:
+    """Per-process LRU store bounded by a byte budget"""
+
+    def __init__(self, max_bytes):
+        self.entries = LRUCache(max_bytes=max_bytes,
+                                sizeof=lambda key, entry: len(key) + len(entry[1]))
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            self.entries.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl):
+        self.entries.set(key, (time.time() + ttl, value))
+
+    def clear(self):
+        self.entries.clear()
+
+class SQLiteBackend:
+    """Store shared by every worker on a host through a local SQLite file.
+
+    The byte budget is enforced every PRUNE_EVERY writes by dropping expired
+    entries, then the least recently read ones. Read times are only written
+    back once they are TOUCH_AFTER seconds old, so hits on a hot entry stay
+    read-only instead of each taking the database write lock.
+    """
+
+    PRUNE_EVERY = 50
+    TOUCH_AFTER = 30
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_accessed ON response_cache (accessed_at)"
+            )
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        connection = self._connect()
+        now = time.time()
+        row = connection.execute(
+            "SELECT value, accessed_at FROM response_cache WHERE key = ? AND expires_at >= ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        value, accessed_at = row
+        if now - accessed_at > self.TOUCH_AFTER:
+            connection.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+                (now, key, now - self.TOUCH_AFTER)
+            )
+        return value
+
+    def set(self, key, value, ttl):
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, size, expires_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now + ttl, now)
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        connection = self._connect()
+        connection.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Oldest reads first until the budget is met
+        excess = total - self.max_bytes
+        for key, size in connection.execute(
+                "SELECT key, size FROM response_cache ORDER BY accessed_at").fetchall():
+            if excess <= 0:
+                break
+            connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            excess -= size
+
+    def clear(self):
+        self._connect().execute("DELETE FROM response_cache")
+
+class RedisBackend:
+    """Any server speaking the Redis protocol; the size budget is its maxmemory policy"""
+
+    def __init__(self, url, prefix='promptkhajana:response:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+class ResponseCache:
+    """Rendered-response cache with a pluggable backend.
+
+    Keys are built by callers from normalized request parameters plus the
+    version counters of the data the page depends on, so writes that bump a
+    version invalidate entries in every worker without explicit deletes.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 60
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        max_bytes = app.config.get('RESPONSE_CACHE_BYTES', 32 * 1024 * 1024)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+
+        if backend == 'memory':
+            self.backend = MemoryBackend(max_bytes)
+        elif backend == 'sqlite':
+            path = app.config.get('RESPONSE_CACHE_PATH') or os.path.join(app.instance_path, 'response_cache.db')
+            self.backend = SQLiteBackend(path, max_bytes)
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config['RESPONSE_CACHE_URL'])
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+        app.extensions['response_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    @staticmethod
+    def make_key(namespace, params, versions):
+        """Stable key from sorted parameters and the data versions they depend on"""
+        parts = [namespace]
+        parts += [f'{name}={value}' for name, value in sorted(params.items())]
+        parts += [f'v:{name}={value}' for name, value in sorted(versions.items())]
+        return namespace + ':' + hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            current_app.logger.warning(f"Response cache read failed: {e}")
+            value = None
+        record_cache_lookup('response', value is not None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl=None):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, value.encode(), ttl or self.ttl)
+        except Exception as e:
+            current_app.logger.warning(f"Response cache write failed: {e}")
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
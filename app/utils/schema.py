@@ -0,0 +1,31 @@
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+from app import db
+
+def migrate_indexes():
+    """Create indexes declared on the models that an existing database lacks.
+
+    `db.create_all()` only builds indexes together with new tables, so this
+    brings older databases up to the declared index set. Every statement is
+    IF NOT EXISTS, which keeps concurrent worker startups safe. Returns the
+    names of the indexes created.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name in existing:
+                    continue
+                connection.execute(CreateIndex(index, if_not_exists=True))
+                created.append(index.name)
+
+        # Fresh statistics let the planner pick between the new indexes
+        if created and db.engine.dialect.name in ('sqlite', 'postgresql'):
+            connection.exec_driver_sql('ANALYZE')
+    return created
@@ -0,0 +1,200 @@
+import math
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from sqlalchemy import bindparam, case, false
+from app.utils.fulltext import tokenize_query
+from app.utils.snapshot import CatalogSnapshot
+
+# Field boosts: a term in the title counts three times as much as one in the content
+FIELD_BOOSTS = {
+    'title': 3.0,
+    'description': 2.0,
+    'use_case': 1.5,
+    'content': 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Default for SEARCH_MAX_RESULTS: when ordering by relevance, only the best-scoring
+# matches are handed back to SQL, so totals, facets and pagination cover at most
+# this many results. Other orders get every match.
+MAX_SEARCH_RESULTS = 1000
+
+class SearchIndex:
+    """In-memory inverted index over prompt text scored with BM25F.
+
+    Postings map a term to {prompt_id: boosted term frequency}. Documents are
+    added, replaced and removed one at a time so write paths never rebuild.
+    Like the filter index, the contents are tagged with the catalog version
+    they reflect and kept current by a CatalogSnapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.postings = defaultdict(dict)
+            self.doc_terms = {}
+            self.doc_lengths = {}
+            self.total_length = 0.0
+            self.version = None
+            self._vocabulary = None
+
+    @property
+    def loaded(self):
+        return self.version is not None
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @staticmethod
+    def _analyze(fields):
+        frequencies = defaultdict(float)
+        length = 0.0
+        for field, boost in FIELD_BOOSTS.items():
+            for term in tokenize_query(fields.get(field)):
+                frequencies[term] += boost
+                length += boost
+        return frequencies, length
+
+    def add(self, prompt_id, fields):
+        """Index (or re-index) one prompt from a mapping of field name to text"""
+        frequencies, length = self._analyze(fields)
+        with self._lock:
+            self.remove(prompt_id)
+            for term, tf in frequencies.items():
+                if term not in self.postings:
+                    self._vocabulary = None
+                self.postings[term][prompt_id] = tf
+            self.doc_terms[prompt_id] = list(frequencies)
+            self.doc_lengths[prompt_id] = length
+            self.total_length += length
+
+    def remove(self, prompt_id):
+        """Drop a prompt from the index if present"""
+        with self._lock:
+            terms = self.doc_terms.pop(prompt_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                posting.pop(prompt_id, None)
+                if not posting:
+                    del self.postings[term]
+                    self._vocabulary = None
+            self.total_length -= self.doc_lengths.pop(prompt_id, 0.0)
+
+    def load(self, version, rows):
+        """Replace the contents from (prompt_id, fields) pairs, built aside so searches keep running"""
+        fresh = SearchIndex()
+        for prompt_id, fields in rows:
+            fresh.add(prompt_id, fields)
+        with self._lock:
+            self.postings = fresh.postings
+            self.doc_terms = fresh.doc_terms
+            self.doc_lengths = fresh.doc_lengths
+            self.total_length = fresh.total_length
+            self._vocabulary = None
+            self.version = version
+
+    def _expand(self, token):
+        """All indexed terms starting with token (prefix match like the SQL backends)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, token)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(token):
+            end += 1
+        return vocabulary[start:end]
+
+    def search(self, search_query, limit=MAX_SEARCH_RESULTS):
+        """Return [(prompt_id, score)] for prompts matching every query token, best first"""
+        tokens = tokenize_query(search_query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            doc_count = len(self.doc_lengths)
+            if not doc_count:
+                return []
+            avg_length = self.total_length / doc_count or 1.0
+
+            scores = None
+            for token in tokens:
+                token_scores = defaultdict(float)
+                for term in self._expand(token):
+                    posting = self.postings[term]
+                    idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for prompt_id, tf in posting.items():
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[prompt_id] / avg_length)
+                        token_scores[prompt_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {pid: score + token_scores[pid]
+                              for pid, score in scores.items() if pid in token_scores}
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+search_index = SearchIndex()
+
+def prompt_fields(prompt):
+    return {field: getattr(prompt, field) for field in FIELD_BOOSTS}
+
+def build_search_index(version):
+    """Load every prompt into the in-memory index"""
+    from app.models import Prompt
+
+    columns = [Prompt.id] + [getattr(Prompt, field) for field in FIELD_BOOSTS]
+    rows = Prompt.query.with_entities(*columns).yield_per(1000)
+    search_index.load(version, ((row[0], dict(zip(FIELD_BOOSTS, row[1:]))) for row in rows))
+
+snapshot = CatalogSnapshot('search index', search_index, build_search_index)
+
+def ensure_search_index():
+    """The process-wide search index, rebuilt when the catalog version changes"""
+    return snapshot.get()
+
+def index_prompt(prompt):
+    """Apply a committed prompt create/update to the loaded index"""
+    fields = prompt_fields(prompt)
+    snapshot.apply(lambda index: index.add(prompt.id, fields))
+
+def unindex_prompt(prompt_id):
+    """Apply a committed prompt delete to the loaded index"""
+    snapshot.apply(lambda index: index.remove(prompt_id))
+
+def apply_search(query, search_query, ranked=True):
+    """Restrict a Prompt query to in-memory BM25 matches.
+
+    Returns the filtered query and a rank expression (lower is better) preserving
+    BM25 order. Without `ranked` (another sort order was asked for) every match is
+    kept and no rank is built.
+    """
+    from flask import current_app
+    from app.models import Prompt
+
+    limit = current_app.config.get('SEARCH_MAX_RESULTS', MAX_SEARCH_RESULTS) if ranked else None
+    matches = ensure_search_index().search(search_query, limit=limit)
+    prompt_ids = [prompt_id for prompt_id, _ in matches]
+    if not prompt_ids:
+        return query.filter(false()), None
+
+    # Rendered inline: a broad query can match more ids than the driver allows bound parameters
+    query = query.filter(Prompt.id.in_(bindparam('search_ids', prompt_ids, expanding=True, literal_execute=True)))
+    if not ranked:
+        return query, None
+    rank = case({prompt_id: position for position, prompt_id in enumerate(prompt_ids)},
+                value=Prompt.id)
+    return query, rank
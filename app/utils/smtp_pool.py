@@ -0,0 +1,143 @@
+import os
+import smtplib
+import threading
+import time
+from flask_mail import Connection
+
+class SMTPPool:
+    """Authenticated SMTP sessions kept open and reused across messages.
+
+    Opening a session costs a TCP connect, EHLO, STARTTLS and AUTH; with
+    the pool that happens once per session instead of once per message. At
+    most MAIL_POOL_SIZE sessions exist per process, senders beyond that
+    wait for a free one. A session idle for more than NOOP_AFTER seconds is
+    checked with NOOP before reuse, one idle for MAIL_POOL_IDLE_TIMEOUT is
+    closed (relays drop idle clients anyway), and a send that finds the
+    session disconnected is retried once on a fresh one.
+
+    Sessions are flask_mail Connection objects, so server settings, message
+    checks, MAIL_MAX_EMAILS and the email_dispatched signal work as with
+    `mail.send`.
+    """
+
+    # Seconds a session may sit idle before it is checked with NOOP
+    NOOP_AFTER = 5
+
+    def __init__(self, app=None):
+        self.app = None
+        self.size = 2
+        self.idle_timeout = 60
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle = []
+        self._pid = os.getpid()
+        self.connects = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.size = max(1, app.config.get('MAIL_POOL_SIZE', self.size))
+        self.idle_timeout = app.config.get('MAIL_POOL_IDLE_TIMEOUT', self.idle_timeout)
+        self._slots = threading.BoundedSemaphore(self.size)
+        app.extensions['smtp_pool'] = self
+
+    def _mail_state(self):
+        return self.app.extensions['mail']
+
+    def _connect(self):
+        from app.utils.metrics import record_smtp_connect
+
+        session = Connection(self._mail_state())
+        session.host = session.configure_host()
+        session.num_emails = 0
+        self.connects += 1
+        record_smtp_connect()
+        return session
+
+    def _close(self, session, polite=True):
+        try:
+            if polite:
+                session.host.quit()
+            else:
+                session.host.close()
+        except (smtplib.SMTPException, OSError):
+            session.host.close()
+
+    def _reset_after_fork(self):
+        # Sockets inherited from the parent belong to its sessions; drop them unused
+        if self._pid != os.getpid():
+            self._idle = []
+            self._slots = threading.BoundedSemaphore(self.size)
+            self._pid = os.getpid()
+
+    def _checkout(self):
+        """An open session, reused if a healthy idle one exists; returns (session, reused)"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                session, last_used = self._idle.pop()
+            idle = time.monotonic() - last_used
+            if idle > self.idle_timeout:
+                self._close(session)
+                continue
+            if idle > self.NOOP_AFTER:
+                try:
+                    code = session.host.noop()[0]
+                except (smtplib.SMTPException, OSError):
+                    code = None
+                if code != 250:
+                    self._close(session, polite=False)
+                    continue
+            return session, True
+        return self._connect(), False
+
+    def _checkin(self, session):
+        with self._lock:
+            self._idle.append((session, time.monotonic()))
+
+    def send(self, message):
+        """Send a flask_mail Message over a pooled session"""
+        state = self._mail_state()
+        if state.suppress:
+            with Connection(state) as connection:
+                connection.send(message)
+            return
+
+        self._reset_after_fork()
+        slots = self._slots
+        slots.acquire()
+        try:
+            session, reused = self._checkout()
+            try:
+                session.send(message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                self._close(session, polite=False)
+                if not reused:
+                    raise
+                # The relay closed a pooled session since the last check
+                self.app.logger.info(f"SMTP session lost ({e}), reconnecting")
+                session = self._connect()
+                try:
+                    session.send(message)
+                except BaseException:
+                    self._close(session, polite=False)
+                    raise
+            except smtplib.SMTPResponseException:
+                # The relay refused this message; the session itself is still usable
+                self._checkin(session)
+                raise
+            except BaseException:
+                self._close(session, polite=False)
+                raise
+            self._checkin(session)
+        finally:
+            slots.release()
+
+    def close(self):
+        """Quit every idle session"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session, _ in idle:
+            self._close(session)
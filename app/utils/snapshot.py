@@ -0,0 +1,88 @@
+import os
+import threading
+from flask import current_app, g
+
+class CatalogSnapshot:
+    """A per-process index tagged with the catalog version it reflects.
+
+    `index` provides `_lock`, `version` and `loaded`; `load(version)` reads
+    the catalog and swaps a fresh copy into it. The first use in a process
+    loads synchronously. After that, a request that sees a newer version
+    (another worker wrote) keeps answering from the current copy while one
+    background thread reloads, so no request waits for a full rebuild. The
+    worker that wrote applies its own change in place with `apply`.
+    """
+
+    def __init__(self, name, index, load):
+        self.name = name
+        self.index = index
+        self.load = load
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+
+    def get(self):
+        """The index, loading it first if this process has none yet"""
+        from app.utils.versions import get_version, CATALOG_VERSION
+
+        version = get_version(CATALOG_VERSION)
+        index = self.index
+        if index.version == version:
+            return index
+        if not index.loaded:
+            with index._lock:
+                if not index.loaded:
+                    self.load(version)
+            return index
+        self._reload_in_background()
+        return index
+
+    def _reloading(self):
+        # Threads do not survive a fork; a forked worker starts its own
+        return self._thread_pid == os.getpid() and self._thread.is_alive()
+
+    def _reload_in_background(self):
+        if self._reloading():
+            return
+        with self._lock:
+            if self._reloading():
+                return
+            app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._reload, args=(app,),
+                                            name=f'{self.name}-reload', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _reload(self, app):
+        from app.utils.versions import get_version, CATALOG_VERSION
+
+        try:
+            with app.app_context():
+                version = get_version(CATALOG_VERSION)
+                if self.index.version != version:
+                    self.load(version)
+        except Exception as e:
+            app.logger.error(f"Failed to reload the {self.name}: {e}")
+
+    def wait(self, timeout=None):
+        """Block until a running background reload finishes"""
+        if self._reloading():
+            self._thread.join(timeout)
+
+    def apply(self, change):
+        """Run `change(index)` for a committed write by this worker.
+
+        The write bumped the catalog by one; if nothing else happened in
+        between, the updated index already matches that version.
+        """
+        from app.utils.versions import get_version, CATALOG_VERSION
+
+        index = self.index
+        if not index.loaded:
+            return
+        with index._lock:
+            change(index)
+            g.pop('cache_versions', None)
+            version = get_version(CATALOG_VERSION)
+            if index.version == version - 1:
+                index.version = version
@@ -0,0 +1,66 @@
+import threading
+from collections import namedtuple
+from sqlalchemy import func
+from app import db
+from app.models import Category, Tag, Prompt, prompt_tags
+from app.utils.versions import get_version, CATALOG_VERSION
+
+TAXONOMY_VERSION = 'taxonomy'
+
+# Immutable snapshots, safe to share between requests and sessions
+CategoryInfo = namedtuple('CategoryInfo', ['id', 'name', 'slug', 'description', 'icon'])
+TagInfo = namedtuple('TagInfo', ['id', 'name', 'slug'])
+
+class Taxonomy:
+    def __init__(self, version, categories, tags):
+        self.version = version
+        self.categories = categories
+        self.tags = tags
+        self.categories_by_slug = {category.slug: category for category in categories}
+        self.tags_by_slug = {tag.slug: tag for tag in tags}
+
+    def category_id(self, slug):
+        category = self.categories_by_slug.get(slug)
+        return category.id if category else None
+
+    def tag_id(self, slug):
+        tag = self.tags_by_slug.get(slug)
+        return tag.id if tag else None
+
+_lock = threading.Lock()
+_taxonomy = None
+
+def load_taxonomy(version):
+    categories = [
+        CategoryInfo(c.id, c.name, c.slug, c.description, c.icon)
+        for c in Category.query.order_by(Category.name)
+    ]
+    tags = [TagInfo(t.id, t.name, t.slug) for t in Tag.query.order_by(Tag.name)]
+    return Taxonomy(version, categories, tags)
+
+def get_taxonomy():
+    """Ordered categories and tags plus slug lookups, reloaded only when the version changes"""
+    global _taxonomy
+    version = get_version(TAXONOMY_VERSION)
+    taxonomy = _taxonomy
+    if taxonomy is None or taxonomy.version != version:
+        with _lock:
+            if _taxonomy is None or _taxonomy.version != version:
+                _taxonomy = load_taxonomy(version)
+            taxonomy = _taxonomy
+    return taxonomy
+
+TagCounts = namedtuple('TagCounts', ['version', 'total', 'by_tag'])
+
+_tag_counts = None
+
+def get_tag_counts():
+    """Total prompts and prompts per tag id, recounted only when the catalog version changes"""
+    global _tag_counts
+    version = get_version(CATALOG_VERSION)
+    counts = _tag_counts
+    if counts is None or counts.version != version:
+        rows = db.session.query(prompt_tags.c.tag_id, func.count()).group_by(prompt_tags.c.tag_id)
+        counts = TagCounts(version, db.session.query(func.count(Prompt.id)).scalar(), dict(rows.all()))
+        _tag_counts = counts
+    return counts
@@ -0,0 +1,47 @@
+from flask import g
+from sqlalchemy import update, insert
+from app import db
+from app.models import CacheVersion, get_current_timestamp
+
+# Bumped by every prompt create/update/delete
+CATALOG_VERSION = 'catalog'
+
+# Bumped whenever buffered view counts are written
+VIEWS_VERSION = 'views'
+
+def get_versions():
+    """All cache version counters as {name: (version, updated_at)}, read once per request/app context"""
+    versions = g.get('cache_versions')
+    if versions is None:
+        rows = db.session.query(CacheVersion.name, CacheVersion.version, CacheVersion.updated_at)
+        versions = {name: (version, updated_at) for name, version, updated_at in rows}
+        g.cache_versions = versions
+    return versions
+
+def get_version(name):
+    return get_versions().get(name, (0, None))[0]
+
+def get_version_info(name):
+    """(version, updated_at) for a counter; (0, None) if it was never bumped"""
+    return get_versions().get(name, (0, None))
+
+def bump_version(name):
+    """Invalidate caches named `name` in every worker; commits with the caller's transaction"""
+    updated = CacheVersion.query.filter_by(name=name).update(
+        {CacheVersion.version: CacheVersion.version + 1, CacheVersion.updated_at: get_current_timestamp()},
+        synchronize_session=False
+    )
+    if not updated:
+        db.session.add(CacheVersion(name=name, version=1))
+    g.pop('cache_versions', None)
+
+def bump_version_on(connection, name):
+    """bump_version for code running on a Core connection outside the ORM session"""
+    versions = CacheVersion.__table__
+    result = connection.execute(
+        update(versions)
+        .where(versions.c.name == name)
+        .values(version=versions.c.version + 1, updated_at=get_current_timestamp())
+    )
+    if not result.rowcount:
+        connection.execute(insert(versions).values(name=name, version=1, updated_at=get_current_timestamp()))
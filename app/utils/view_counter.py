@@ -0,0 +1,112 @@
+import atexit
+import os
+import threading
+from collections import Counter
+from sqlalchemy import update, bindparam
+from app.utils.metrics import VIEW_BACKLOG
+
+class ViewCounter:
+    """Write-behind buffer for prompt view counts.
+
+    Views are aggregated per prompt id in memory and written as a single
+    batched `UPDATE prompts SET views = views + n` when the buffer reaches
+    VIEW_FLUSH_THRESHOLD pending views, every VIEW_FLUSH_INTERVAL seconds,
+    and when the process exits. Request handlers never write to the database.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 10
+        self.threshold = 100
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._pending_total = 0
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self.flushed_views = 0
+        self.failed_flushes = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('VIEW_FLUSH_INTERVAL', self.interval)
+        self.threshold = app.config.get('VIEW_FLUSH_THRESHOLD', self.threshold)
+        app.extensions['view_counter'] = self
+        atexit.register(self.flush)
+
+    def record(self, prompt_id, count=1):
+        """Buffer `count` views of a prompt"""
+        with self._lock:
+            self._pending[prompt_id] += count
+            self._pending_total += count
+            full = self._pending_total >= self.threshold
+            VIEW_BACKLOG.set(self._pending_total)
+        self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def pending(self, prompt_id=None):
+        """Buffered views not yet written, for one prompt or in total"""
+        with self._lock:
+            if prompt_id is None:
+                return self._pending_total
+            return self._pending.get(prompt_id, 0)
+
+    def flush(self):
+        """Write all buffered views in one batched UPDATE; returns views written"""
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+            self._pending_total = 0
+            VIEW_BACKLOG.set(0)
+        if not batch or self.app is None:
+            return 0
+
+        from app import db
+        from app.models import Prompt
+        from app.utils.versions import bump_version_on, VIEWS_VERSION
+
+        prompts = Prompt.__table__
+        statement = (
+            update(prompts)
+            .where(prompts.c.id == bindparam('prompt_id'))
+            # Keep updated_at untouched: a view is not an edit
+            .values(views=prompts.c.views + bindparam('increment'), updated_at=prompts.c.updated_at)
+        )
+        params = [{'prompt_id': prompt_id, 'increment': n} for prompt_id, n in batch.items()]
+
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(statement, params)
+                    bump_version_on(connection, VIEWS_VERSION)
+        except Exception as e:
+            self.failed_flushes += 1
+            with self._lock:
+                self._pending.update(batch)
+                self._pending_total += sum(batch.values())
+                VIEW_BACKLOG.set(self._pending_total)
+            self.app.logger.error(f"Failed to flush view counts: {e}")
+            return 0
+
+        written = sum(batch.values())
+        self.flushed_views += written
+        return written
+
+    def _ensure_worker(self):
+        # Started lazily so each forked gunicorn worker runs its own flusher
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
@@ -0,0 +1,6 @@
+"""
+Large-catalog data generator and route benchmarks.
+
+    python -m benchmarks.generate --size 100k --database sqlite:///bench.db
+    python -m benchmarks.run --database sqlite:///bench.db --output baseline.json
+"""
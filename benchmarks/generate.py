@@ -0,0 +1,157 @@
+"""
+Synthetic prompt catalog of a given size, built on the seed categories and tags
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+BATCH_SIZE = 5000
+
+VERBS = ['Design', 'Review', 'Refactor', 'Debug', 'Document', 'Optimize', 'Test', 'Secure',
+         'Migrate', 'Profile', 'Explain', 'Harden', 'Scale', 'Audit', 'Automate']
+SUBJECTS = ['REST endpoint', 'database schema', 'React component', 'background job', 'CLI tool',
+            'authentication flow', 'caching layer', 'message queue consumer', 'CI pipeline',
+            'search feature', 'payment integration', 'data export', 'logging setup',
+            'microservice', 'GraphQL resolver', 'Docker image', 'ORM query', 'rate limiter']
+QUALIFIERS = ['for production', 'step by step', 'with edge cases', 'for a legacy codebase',
+              'under load', 'for a small team', 'with examples', 'from scratch']
+WORDS = ('the a an for with without across into over under request response latency memory '
+         'throughput error retry timeout cache index query schema migration deploy rollback '
+         'coverage fixture mock contract interface module function class service client server '
+         'token session queue worker batch stream pagination cursor filter sort metric trace').split()
+DIFFICULTIES = ['Beginner', 'Intermediate', 'Advanced']
+DIFFICULTY_WEIGHTS = [0.25, 0.5, 0.25]
+
+def parse_size(value):
+    value = value.lower()
+    if value in SIZES:
+        return SIZES[value]
+    return int(value)
+
+def sentence(rng, words):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+def paragraph(rng, length):
+    """Roughly `length` characters of filler text"""
+    sentences = []
+    size = 0
+    while size < length:
+        sentences.append(sentence(rng, rng.randint(6, 16)))
+        size += len(sentences[-1]) + 1
+    return ' '.join(sentences)
+
+def markdown_content(rng, length):
+    """Prompt body with the headings, lists and code blocks real prompts use"""
+    sections = []
+    size = 0
+    while size < length:
+        lines = [f'## {rng.choice(VERBS)} {rng.choice(SUBJECTS)}', paragraph(rng, 200)]
+        lines += [f'- {sentence(rng, rng.randint(4, 10))}' for _ in range(rng.randint(2, 5))]
+        if rng.random() < 0.3:
+            lines += ['```python', 'def handler(request):', '    return process(request)', '```']
+        section = '\n'.join(lines)
+        sections.append(section)
+        size += len(section)
+    return '\n\n'.join(sections)
+
+def content_length(rng):
+    # Log-normal: most prompts are a page or two, a long tail runs to ~20k characters
+    return int(min(20000, max(200, rng.lognormvariate(7.2, 0.7))))
+
+def tag_weights(count):
+    # Zipf-like popularity: a few tags (Python, API...) dominate, most are rare
+    return [1 / (rank + 1) ** 1.1 for rank in range(count)]
+
+def generate_prompts(size, seed=42):
+    """Insert `size` synthetic prompts with Core batches; returns the number inserted"""
+    from sqlalchemy import insert
+    from app import db
+    from app.models import Prompt, prompt_tags
+    from app.utils.versions import bump_version, CATALOG_VERSION
+    from app.utils.taxonomy import TAXONOMY_VERSION
+    from seed_data import create_categories, create_tags
+
+    rng = random.Random(seed)
+    categories = create_categories()
+    tags = create_tags()
+    category_ids = [category.id for category in categories]
+    category_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(category_ids))]
+    tag_ids = [tag.id for tag in tags]
+    weights = tag_weights(len(tag_ids))
+    tag_names = {tag.id: tag.name for tag in tags}
+
+    # Ids come from the database (INSERT ... RETURNING), so PostgreSQL's
+    # sequence stays in step and later inserts through the app don't collide
+    insert_prompts = insert(Prompt.__table__).returning(Prompt.__table__.c.id, sort_by_parameter_order=True)
+    now = datetime.utcnow()
+    inserted = 0
+    started = time.perf_counter()
+
+    while inserted < size:
+        prompts = []
+        chosen_tags = []
+        for _ in range(min(BATCH_SIZE, size - inserted)):
+            chosen = set(rng.choices(tag_ids, weights=weights, k=rng.randint(1, 5)))
+            topic = ' '.join(tag_names[tag_id] for tag_id in sorted(chosen)[:2])
+            created_at = now - timedelta(seconds=rng.randint(0, 2 * 365 * 24 * 3600))
+            prompts.append({
+                'title': f'{rng.choice(VERBS)} a {topic} {rng.choice(SUBJECTS)} {rng.choice(QUALIFIERS)}',
+                'description': paragraph(rng, rng.randint(80, 300))[:500],
+                'content': markdown_content(rng, content_length(rng)),
+                'use_case': paragraph(rng, rng.randint(80, 250)),
+                'examples': paragraph(rng, rng.randint(0, 400)) if rng.random() < 0.7 else None,
+                'difficulty': rng.choices(DIFFICULTIES, weights=DIFFICULTY_WEIGHTS)[0],
+                'rating': round(rng.uniform(3.0, 5.0), 1),
+                'views': int(rng.paretovariate(1.2)) - 1,
+                'category_id': rng.choices(category_ids, weights=category_weights)[0],
+                'created_at': created_at,
+                'updated_at': created_at,
+            })
+            chosen_tags.append(chosen)
+            inserted += 1
+
+        prompt_ids = db.session.execute(insert_prompts, prompts).scalars().all()
+        links = [{'prompt_id': prompt_id, 'tag_id': tag_id}
+                 for prompt_id, chosen in zip(prompt_ids, chosen_tags) for tag_id in chosen]
+        db.session.execute(insert(prompt_tags), links)
+        db.session.commit()
+        rate = inserted / (time.perf_counter() - started)
+        print(f"  {inserted}/{size} prompts ({rate:.0f}/s)", file=sys.stderr)
+
+    bump_version(CATALOG_VERSION)
+    bump_version(TAXONOMY_VERSION)
+    db.session.commit()
+    return inserted
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--size', default='10k', help="10k, 100k, 1m or an exact prompt count")
+    parser.add_argument('--database', help='DATABASE_URL to fill (default: the configured one)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed, for reproducible catalogs')
+    parser.add_argument('--render', action='store_true', help='pre-render markdown for every prompt')
+    parser.add_argument('--related', action='store_true', help='precompute related prompts')
+    args = parser.parse_args(argv)
+
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        count = generate_prompts(parse_size(args.size), seed=args.seed)
+        print(f"✅ Generated {count} prompts")
+
+        if args.render:
+            from app.routes.main import render_stale_prompts
+            print(f"✅ Rendered markdown for {render_stale_prompts()} prompts")
+        if args.related:
+            from app.utils.related import rebuild_related
+            print(f"✅ Computed related prompts for {rebuild_related()} prompts")
+
+if __name__ == '__main__':
+    main()
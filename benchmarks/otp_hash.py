@@ -0,0 +1,54 @@
+"""
+OTP hashing micro-benchmark: HMAC-SHA256 against werkzeug password hashing
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.otp_hash import HMACHasher, WerkzeugHasher
+
+def time_calls(func, iterations):
+    """Mean microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def bench_hasher(hasher, iterations):
+    code = '123456'
+    stored = hasher.hash(code)
+    return {
+        'hash_us': time_calls(lambda: hasher.hash(code), iterations),
+        'verify_us': time_calls(lambda: hasher.verify(stored, code), iterations),
+        'verify_wrong_us': time_calls(lambda: hasher.verify(stored, '654321'), iterations),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--iterations', type=int, default=20000, help='calls per HMAC measurement')
+    parser.add_argument('--werkzeug-iterations', type=int, default=20,
+                        help='calls per werkzeug measurement (each takes tens of milliseconds)')
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    results = {
+        'hmac': bench_hasher(HMACHasher('benchmark-secret'), args.iterations),
+        'werkzeug': bench_hasher(WerkzeugHasher(), args.werkzeug_iterations),
+    }
+
+    print(f"{'hasher':<10} {'hash us':>12} {'verify us':>12} {'wrong us':>12}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['hash_us']:>12.1f} {result['verify_us']:>12.1f} {result['verify_wrong_us']:>12.1f}")
+    speedup = results['werkzeug']['verify_us'] / results['hmac']['verify_us']
+    print(f"HMAC verifies {speedup:,.0f}x faster")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Route latency, query count and peak memory benchmarks, written as a JSON baseline
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_ADMIN_EMAIL = 'bench-admin@promptkhajana.local'
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def build_scenarios(rng, prompt_ids, category_slugs, tag_slugs):
+    """(name, urls, logged_in) triples; each iteration takes the next url in the list.
+
+    Logged-in scenarios run as a superadmin, which also covers login-only pages.
+    """
+    sample = rng.sample(prompt_ids, min(50, len(prompt_ids)))
+    category = category_slugs[0]
+    tag = tag_slugs[0]
+    return [
+        ('index', ['/'], False),
+        ('index_sort_popular', ['/?sort=popular'], False),
+        ('index_sort_rating', ['/?sort=rating'], False),
+        ('index_search', ['/?search=cache', '/?search=migration+rollback', '/?search=token'], False),
+        ('index_search_relevance', ['/?search=cache&sort=relevance'], False),
+        ('index_category', [f'/?category={slug}' for slug in category_slugs], False),
+        ('index_tag', [f'/?tag={slug}' for slug in tag_slugs], False),
+        ('index_difficulty', ['/?difficulty=Beginner', '/?difficulty=Advanced'], False),
+        ('index_combined', [f'/?category={category}&tag={tag}&difficulty=Advanced&sort=rating'], False),
+        ('view_prompt', [f'/prompt/{prompt_id}' for prompt_id in sample], True),
+        ('category', [f'/category/{slug}' for slug in category_slugs], False),
+        ('api_prompts', ['/api/prompts', f'/api/prompts?tag={tag}&sort=popular'], False),
+        ('api_prompt_facets', ['/api/prompts/facets', f'/api/prompts/facets?category={category}'], False),
+        ('api_categories', ['/api/categories'], False),
+        ('admin_dashboard', ['/admin/dashboard'], True),
+        ('admin_prompts', ['/admin/prompts'], True),
+        ('admin_categories', ['/admin/categories'], True),
+        ('admin_tags', ['/admin/tags'], True),
+    ]
+
+def login_client(app):
+    from app import db
+    from app.models import User
+
+    with app.app_context():
+        user = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first()
+        if user is None:
+            user = User(username='bench-admin', email=BENCH_ADMIN_EMAIL, is_admin=True, email_verified=True)
+            user.set_password(os.urandom(16).hex())
+            db.session.add(user)
+            db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+def run_scenario(client, urls, iterations, warmup, counter):
+    for position in range(warmup):
+        client.get(urls[position % len(urls)])
+
+    timings = []
+    queries = []
+    statuses = set()
+    for position in range(iterations):
+        counter['queries'] = 0
+        started = time.perf_counter()
+        response = client.get(urls[position % len(urls)])
+        timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter['queries'])
+        statuses.add(response.status_code)
+
+    # Memory is traced on a separate request so tracing overhead stays out of the timings
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    client.get(urls[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'urls': urls[:3],
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'statuses': sorted(statuses),
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(app, iterations=100, warmup=5, only=None, seed=42):
+    from sqlalchemy import event
+    from app import db
+    from app.models import Prompt, Category, Tag
+
+    with app.app_context():
+        prompt_ids = [row[0] for row in db.session.query(Prompt.id)]
+        category_slugs = [row[0] for row in db.session.query(Category.slug).order_by(Category.slug)]
+        tag_slugs = [row[0] for row in db.session.query(Tag.slug).order_by(Tag.slug)]
+        engine = db.engine
+        dialect = engine.dialect.name
+    if not prompt_ids:
+        raise SystemExit("The database has no prompts; run `python -m benchmarks.generate` first")
+
+    counter = {'queries': 0}
+    def count_query(*args):
+        counter['queries'] += 1
+    event.listen(engine, 'before_cursor_execute', count_query)
+
+    anonymous = app.test_client()
+    admin = login_client(app)
+    scenarios = build_scenarios(random.Random(seed), prompt_ids, category_slugs, tag_slugs)
+
+    results = {}
+    try:
+        for name, urls, logged_in in scenarios:
+            if only and name not in only:
+                continue
+            result = run_scenario(admin if logged_in else anonymous, urls, iterations, warmup, counter)
+            results[name] = result
+            print(f"  {name:<24} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+                  f"p99 {result['p99_ms']:>9.2f} ms  {result['queries_per_request']:>6} queries  "
+                  f"{result['peak_memory_kb']:>9.1f} KiB", file=sys.stderr)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_query)
+
+    return {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'revision': git_revision(),
+            'prompts': len(prompt_ids),
+            'database': dialect,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': iterations,
+            'warmup': warmup,
+            'config': {key: app.config.get(key) for key in (
+                'SEARCH_ENGINE', 'FILTER_INDEX', 'RESPONSE_CACHE_BACKEND', 'FULLTEXT_BACKEND')},
+        },
+        'scenarios': results,
+    }
+
+def compare(baseline, current):
+    """Print p50/p95/queries changes of `current` relative to `baseline`"""
+    print(f"{'scenario':<24} {'p50':>18} {'p95':>18} {'queries':>14}")
+    for name, result in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            print(f"{name:<24} (new)")
+            continue
+        cells = []
+        for key in ('p50_ms', 'p95_ms'):
+            change = (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{result[key]:>8.2f} ({change:+6.1f}%)")
+        cells.append(f"{before['queries_per_request']:>5} -> {result['queries_per_request']:<5}")
+        print(f"{name:<24} {cells[0]:>18} {cells[1]:>18} {cells[2]:>14}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--database', help='DATABASE_URL to benchmark (default: the configured one)')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help='scenario names to run')
+    parser.add_argument('--response-cache', default='none',
+                        help='RESPONSE_CACHE_BACKEND for the run (default: none, to time rendering)')
+    parser.add_argument('--output', default='benchmark-baseline.json', help='JSON file to write')
+    parser.add_argument('--baseline', help='earlier JSON result to compare against')
+    args = parser.parse_args(argv)
+
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    os.environ['RESPONSE_CACHE_BACKEND'] = args.response_cache
+
+    from app import create_app
+    app = create_app()
+    app.logger.setLevel('WARNING')
+
+    results = run_benchmarks(app, iterations=args.iterations, warmup=args.warmup, only=args.only)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"✅ Wrote {len(results['scenarios'])} scenarios to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(json.load(f), results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""
+Gunicorn settings picked up automatically from the project directory.
+
+With PROMETHEUS_MULTIPROC_DIR set, workers share their metric samples through
+that directory; it is emptied when the master starts and a dead worker's
+live gauges are dropped when it exits.
+"""
+import os
+import shutil
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def on_starting(server):
+    directory = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
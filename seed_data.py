@@ -3,6 +3,8 @@ Seed data script to populate the database with professional developer prompts
 """
 from app import create_app, db
 from app.models import Category, Tag, Prompt
+from app.utils.versions import bump_version, CATALOG_VERSION
+from app.utils.taxonomy import TAXONOMY_VERSION
 
 def create_categories():
     """Create predefined categories"""
@@ -1590,9 +1592,15 @@ def seed_database():
     tags = create_tags()
     print(f"✅ Created {len(tags)} tags")
     
+    # Let running workers reload their taxonomy cache
+    bump_version(TAXONOMY_VERSION)
+    db.session.commit()
+    
     # Create prompts
     print("💡 Creating prompts...")
     create_prompts(categories, tags)
+    bump_version(CATALOG_VERSION)
+    db.session.commit()
     
     print("✨ Database seeding completed successfully!")
 
@@ -0,0 +1,75 @@
+import contextlib
+import io
+import pytest
+from sqlalchemy import event, text
+
+def reset_process_caches():
+    """Forget per-process snapshots that belong to a previous test database"""
+    from app.utils import taxonomy, filter_index, search_index
+
+    taxonomy._taxonomy = None
+    taxonomy._tag_counts = None
+    filter_index.filter_index.version = None
+    search_index.search_index.clear()
+
+@pytest.fixture
+def make_catalog(tmp_path, monkeypatch):
+    """Build an app over a fresh SQLite database holding `size` synthetic prompts"""
+    monkeypatch.setenv('RESPONSE_CACHE_BACKEND', 'none')
+    monkeypatch.setenv('EMAIL_OUTBOX_WORKERS', '0')
+    monkeypatch.setenv('METRICS_ENABLED', 'False')
+
+    def make(size, **config):
+        """`config` is passed through the environment, so extensions see it in init_app"""
+        from app import create_app, db
+        from benchmarks.generate import generate_prompts
+
+        monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path}/catalog-{size}.db')
+        for key, value in config.items():
+            monkeypatch.setenv(key, str(value))
+        app = create_app()
+        app.config['TESTING'] = True
+        reset_process_caches()
+        with app.app_context(), contextlib.redirect_stderr(io.StringIO()):
+            generate_prompts(size)
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+        return app
+
+    yield make
+    reset_process_caches()
+
+def admin_client(app):
+    from app import db
+    from app.models import User
+
+    with app.app_context():
+        user = User(username='admin', email='admin@example.com', is_admin=True, email_verified=True)
+        user.set_password('Secret123!')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+@contextlib.contextmanager
+def capture_statements(app):
+    """Collect (statement, parameters) for everything the app's engine executes"""
+    from app import db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
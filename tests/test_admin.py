@@ -0,0 +1,41 @@
+from sqlalchemy import insert
+from tests.conftest import admin_client
+
+def versions(app):
+    from app.utils.versions import get_version, CATALOG_VERSION
+    from app.utils.taxonomy import TAXONOMY_VERSION
+
+    with app.app_context():
+        return get_version(CATALOG_VERSION), get_version(TAXONOMY_VERSION)
+
+def tag_ids(app, used):
+    from app import db
+    from app.models import Tag, prompt_tags
+
+    with app.app_context():
+        tagged = db.session.query(prompt_tags.c.tag_id)
+        query = Tag.query.filter(Tag.id.in_(tagged) if used else Tag.id.not_in(tagged))
+        return [tag.id for tag in query]
+
+def test_deleting_a_used_tag_invalidates_the_catalog(make_catalog):
+    app = make_catalog(20)
+    client = admin_client(app)
+    catalog, taxonomy = versions(app)
+
+    response = client.post(f'/admin/tags/delete/{tag_ids(app, used=True)[0]}')
+    assert response.status_code == 302
+    assert versions(app) == (catalog + 1, taxonomy + 1)
+
+def test_deleting_an_unused_tag_keeps_the_catalog(make_catalog):
+    from app import db
+    from app.models import Tag
+
+    app = make_catalog(20)
+    with app.app_context():
+        db.session.execute(insert(Tag.__table__).values(name='Unused', slug='unused'))
+        db.session.commit()
+    client = admin_client(app)
+    catalog, taxonomy = versions(app)
+
+    client.post(f'/admin/tags/delete/{tag_ids(app, used=False)[0]}')
+    assert versions(app) == (catalog, taxonomy + 1)
@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+from app.utils.conditional import compute_build_id
+
+def test_build_id_follows_templates(tmp_path):
+    template = tmp_path / 'templates' / 'page.html'
+    template.parent.mkdir()
+    template.write_text('<p>one</p>')
+    app = SimpleNamespace(root_path=str(tmp_path))
+    before = compute_build_id(app, 'renderer-1')
+
+    assert compute_build_id(app, 'renderer-2') != before
+    template.write_text('<p>two, longer</p>')
+    assert compute_build_id(app, 'renderer-1') != before
+
+def test_new_build_invalidates_etags(make_catalog):
+    app = make_catalog(10)
+    client = app.test_client()
+    response = client.get('/api/categories')
+    etag = response.headers['ETag']
+    assert client.get('/api/categories', headers={'If-None-Match': etag}).status_code == 304
+
+    app.config['BUILD_ID'] = 'next-deploy'
+    assert client.get('/api/categories', headers={'If-None-Match': etag}).status_code == 200
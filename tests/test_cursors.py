@@ -0,0 +1,43 @@
+import base64
+import json
+import pytest
+
+def make_token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+MALFORMED = [
+    {'s': 'newest', 'd': 'next', 'v': [[1], 5]},
+    {'s': 'newest', 'd': 'next', 'v': ['abc', 5]},
+    {'s': 'newest', 'd': 'next', 'v': [{'dt': 5}, 5]},
+    {'s': 'newest', 'd': 'next', 'v': [{'dt': '2024-01-01T00:00:00'}, '5']},
+    {'s': 'newest', 'd': 'next', 'v': [{'dt': '2024-01-01T00:00:00+00:00'}, 5]},
+    {'s': 'popular', 'd': 'next', 'v': [True, 5]},
+    {'s': 'rating', 'd': 'next', 'v': [{'dt': '2024-01-01T00:00:00'}, 5]},
+]
+
+SORT_PARAMS = {'newest': '', 'popular': '&sort=popular', 'rating': '&sort=rating'}
+
+@pytest.fixture(params=[False, True], ids=['sql', 'filter_index'])
+def app(make_catalog, request):
+    return make_catalog(60, FILTER_INDEX=request.param)
+
+@pytest.mark.parametrize('payload', MALFORMED)
+def test_malformed_cursor_values_are_rejected(app, payload):
+    from app.models import Category
+
+    with app.app_context():
+        category = Category.query.order_by(Category.id).first().slug
+    client = app.test_client()
+    token = make_token(payload)
+    sort = SORT_PARAMS[payload['s']]
+    assert client.get(f'/?cursor={token}{sort}').status_code == 400
+    assert client.get(f'/api/prompts?cursor={token}{sort}').status_code == 400
+    if payload['s'] == 'newest':
+        assert client.get(f'/category/{category}?cursor={token}').status_code == 400
+
+def test_issued_cursors_still_work(app):
+    client = app.test_client()
+    for sort in SORT_PARAMS.values():
+        response = client.get(f'/api/prompts?limit=5{sort}')
+        next_url = response.headers['Link'].split('>')[0].lstrip('<')
+        assert client.get(next_url).status_code == 200
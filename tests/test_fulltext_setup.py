@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+STARTUP = """
+import os, sys, time
+from app import create_app
+start = float(sys.argv[1])
+time.sleep(max(0, start - time.time()))
+app = create_app()
+print(app.config['FULLTEXT_BACKEND'])
+"""
+
+def test_workers_starting_together_all_use_fts(tmp_path):
+    import time
+
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{tmp_path}/fresh.db', EMAIL_OUTBOX_WORKERS='0',
+               METRICS_ENABLED='False', PYTHONPATH=os.getcwd())
+    start = str(time.time() + 3)
+    workers = [subprocess.Popen([sys.executable, '-c', STARTUP, start], env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True)
+               for _ in range(4)]
+    backends = [worker.communicate(timeout=60)[0].strip() for worker in workers]
+    assert backends == ['sqlite'] * 4
@@ -0,0 +1,14 @@
+def test_metrics_are_off_by_default(make_catalog, monkeypatch):
+    monkeypatch.delenv('METRICS_ENABLED')
+    app = make_catalog(1)
+    assert app.test_client().get('/metrics').status_code == 404
+
+def test_metrics_token_is_required(make_catalog):
+    app = make_catalog(1, METRICS_ENABLED='True', METRICS_TOKEN='scrape-secret')
+    client = app.test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+    assert b'promptkhajana_requests_total' in response.data
@@ -0,0 +1,50 @@
+import time
+import pytest
+from app.utils.otp_store import (OtpStore, MemoryOtpStore, RedisOtpStore,
+                                 VERIFIED, MISSING, EXPIRED, LOCKED, INVALID)
+
+EMAIL = 'user@example.com'
+
+def matches(code):
+    # Stores only see hashes; in these tests the "hash" is the code itself
+    return lambda stored: stored == code
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request):
+    if request.param == 'memory':
+        return MemoryOtpStore()
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisOtpStore(client=fakeredis.FakeRedis())
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        OtpStore()
+
+def test_code_verifies_once(store):
+    store.issue(EMAIL, 'login', '123456', ttl=60)
+    assert store.verify(EMAIL, 'login', matches('123456'), max_attempts=3) == VERIFIED
+    assert store.verify(EMAIL, 'login', matches('123456'), max_attempts=3) == MISSING
+
+def test_codes_are_kept_per_purpose(store):
+    store.issue(EMAIL, 'login', '123456', ttl=60)
+    assert store.verify(EMAIL, 'reset', matches('123456'), max_attempts=3) == MISSING
+    assert store.verify(EMAIL, 'login', matches('123456'), max_attempts=3) == VERIFIED
+
+def test_new_code_replaces_pending_one(store):
+    store.issue(EMAIL, 'login', '111111', ttl=60)
+    store.issue(EMAIL, 'login', '222222', ttl=60)
+    assert store.verify(EMAIL, 'login', matches('111111'), max_attempts=3) == INVALID
+    assert store.verify(EMAIL, 'login', matches('222222'), max_attempts=3) == VERIFIED
+
+def test_attempt_limit_locks_the_code(store):
+    store.issue(EMAIL, 'login', '123456', ttl=60)
+    for _ in range(3):
+        assert store.verify(EMAIL, 'login', matches('000000'), max_attempts=3) == INVALID
+    assert store.verify(EMAIL, 'login', matches('123456'), max_attempts=3) == LOCKED
+
+def test_expired_code_does_not_verify(store):
+    store.issue(EMAIL, 'login', '123456', ttl=1)
+    time.sleep(1.1)
+    # Redis drops the key itself, so an expired code reads as missing there
+    assert store.verify(EMAIL, 'login', matches('123456'), max_attempts=3) in (EXPIRED, MISSING)
+    assert store.verify(EMAIL, 'login', matches('123456'), max_attempts=3) == MISSING
@@ -0,0 +1,105 @@
+import smtplib
+from datetime import datetime, timedelta
+import pytest
+
+class StubPool:
+    """Stands in for smtp_pool; the first `failures` sends raise"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, message):
+        if self.failures:
+            self.failures -= 1
+            raise smtplib.SMTPServerDisconnected('relay went away')
+        self.sent.append(message)
+
+@pytest.fixture
+def app(make_catalog):
+    return make_catalog(1, EMAIL_MAX_ATTEMPTS=2, EMAIL_RETRY_BACKOFF=30)
+
+def queue(app):
+    from app import email_outbox
+
+    with app.app_context():
+        email = email_outbox.enqueue('user@example.com', 'Your code', html_body='<p>123456</p>',
+                                     text_body='123456', purpose='login')
+        assert email.status == 'pending'
+        return email.id
+
+def get_email(app, email_id):
+    from app import db
+    from app.models import OutboxEmail
+
+    with app.app_context():
+        email = db.session.get(OutboxEmail, email_id)
+        db.session.expunge(email)
+        return email
+
+def test_queued_email_is_delivered(app, monkeypatch):
+    from app import smtp_pool, email_outbox
+
+    pool = StubPool()
+    monkeypatch.setattr(smtp_pool, 'send', pool.send)
+    email_id = queue(app)
+
+    assert email_outbox.process() == 1
+    assert [(message.recipients, message.subject) for message in pool.sent] == [(['user@example.com'], 'Your code')]
+    email = get_email(app, email_id)
+    assert (email.status, email.attempts, email.last_error) == ('sent', 1, None)
+    assert email.sent_at is not None
+    # The code must not stay in the table once delivered
+    assert email.html_body is None and email.text_body is None
+
+def test_failed_send_is_retried_after_backoff(app, monkeypatch):
+    from app import db, smtp_pool, email_outbox
+    from app.models import OutboxEmail
+
+    pool = StubPool(failures=1)
+    monkeypatch.setattr(smtp_pool, 'send', pool.send)
+    email_id = queue(app)
+    before = datetime.utcnow()
+
+    assert email_outbox.process() == 1
+    email = get_email(app, email_id)
+    assert (email.status, email.attempts) == ('pending', 1)
+    assert 'relay went away' in email.last_error
+    assert email.next_attempt_at >= before + timedelta(seconds=30 * 0.8)
+
+    # Not due yet
+    assert email_outbox.process() == 0
+    with app.app_context():
+        db.session.get(OutboxEmail, email_id).next_attempt_at = datetime.utcnow()
+        db.session.commit()
+
+    assert email_outbox.process() == 1
+    email = get_email(app, email_id)
+    assert (email.status, email.attempts, email.last_error) == ('sent', 2, None)
+    assert len(pool.sent) == 1
+
+def test_email_fails_after_max_attempts(app, monkeypatch):
+    from app import db, smtp_pool, email_outbox
+    from app.models import OutboxEmail
+
+    monkeypatch.setattr(smtp_pool, 'send', StubPool(failures=10).send)
+    email_id = queue(app)
+
+    assert email_outbox.process() == 1
+    with app.app_context():
+        db.session.get(OutboxEmail, email_id).next_attempt_at = datetime.utcnow()
+        db.session.commit()
+    assert email_outbox.process() == 1
+
+    email = get_email(app, email_id)
+    assert (email.status, email.attempts) == ('failed', 2)
+    assert 'relay went away' in email.last_error
+    assert email.html_body is None and email.text_body is None
+    assert email_outbox.process() == 0
+
+def test_retry_delay_grows_exponentially_up_to_the_cap(app):
+    from app import email_outbox
+
+    assert 30 * 0.8 <= email_outbox.retry_delay(1) <= 30 * 1.2
+    assert 120 * 0.8 <= email_outbox.retry_delay(3) <= 120 * 1.2
+    assert email_outbox.retry_delay(20) <= email_outbox.max_backoff * 1.2
@@ -0,0 +1,24 @@
+from tests.conftest import admin_client, capture_statements
+
+def page_query_counts(app):
+    """Statements per page on a warm worker (taxonomy and version caches loaded)"""
+    from app.models import Category
+
+    with app.app_context():
+        category = Category.query.order_by(Category.id).first().slug
+    client = admin_client(app)
+    counts = {}
+    for name, url in [('index', '/'), ('category', f'/category/{category}'),
+                      ('api', '/api/prompts'), ('admin', '/admin/prompts')]:
+        assert client.get(url).status_code == 200, url
+        with capture_statements(app) as statements:
+            assert client.get(url).status_code == 200, url
+        counts[name] = len(statements)
+    return counts
+
+def test_query_count_does_not_grow_with_catalog(make_catalog):
+    # NPLUSONE_RAISE fails any request that repeats one statement shape
+    config = {'NPLUSONE_DETECT': True, 'NPLUSONE_RAISE': True, 'NPLUSONE_THRESHOLD': 5}
+    small = page_query_counts(make_catalog(30, **config))
+    large = page_query_counts(make_catalog(150, **config))
+    assert small == large
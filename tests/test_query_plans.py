@@ -0,0 +1,79 @@
+import re
+import pytest
+from sqlalchemy import func
+from tests.conftest import admin_client, capture_statements
+
+# A table scan without an index behind it; index-order walks read "SCAN prompts USING INDEX ..."
+FULL_SCAN = re.compile(r'^SCAN prompts$|^SCAN prompts AS')
+
+@pytest.fixture
+def catalog(make_catalog):
+    from app.models import Category, Tag, prompt_tags
+    from app import db
+
+    app = make_catalog(600)
+    with app.app_context():
+        counts = dict(db.session.query(prompt_tags.c.tag_id, func.count()).group_by(prompt_tags.c.tag_id))
+        tags = {tag.id: tag.slug for tag in Tag.query}
+        ranked = sorted(counts, key=counts.get)
+        category = Category.query.order_by(Category.id).first().slug
+    return app, category, tags[ranked[-1]], tags[ranked[0]]
+
+def listing_plans(app, client, url):
+    """EXPLAIN QUERY PLAN details for every ordered prompt listing query a request runs.
+
+    Aggregates (facet counts, category counts) read every matching row by
+    design and are not listing queries, so statements with GROUP BY are skipped.
+    """
+    from app import db
+
+    with capture_statements(app) as statements:
+        response = client.get(url)
+    assert response.status_code == 200, url
+
+    plans = []
+    with app.app_context():
+        raw = db.engine.raw_connection()
+        try:
+            for statement, parameters in statements:
+                if 'FROM prompts' not in statement or 'ORDER BY' not in statement or 'GROUP BY' in statement:
+                    continue
+                rows = raw.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+                plans.append((statement, [row[3] for row in rows]))
+        finally:
+            raw.close()
+    assert plans, f'no listing query for {url}'
+    return plans
+
+def assert_index_plan(plans, url):
+    for statement, details in plans:
+        for detail in details:
+            assert not FULL_SCAN.match(detail), f'{url}: full scan {details}\n{statement}'
+            assert 'TEMP B-TREE' not in detail, f'{url}: sort without an index {details}\n{statement}'
+
+def test_listings_walk_an_index(catalog):
+    app, category, common_tag, rare_tag = catalog
+    client = admin_client(app)
+    for url in ['/', '/?sort=popular', '/?sort=rating', f'/?category={category}', '/?difficulty=Advanced',
+                f'/?tag={common_tag}', f'/?tag={common_tag}&sort=rating', f'/category/{category}',
+                '/api/prompts', f'/api/prompts?tag={common_tag}', '/admin/prompts']:
+        assert_index_plan(listing_plans(app, client, url), url)
+
+def test_next_page_walks_an_index(catalog):
+    app, category, common_tag, rare_tag = catalog
+    client = app.test_client()
+    for url in ['/api/prompts', f'/api/prompts?tag={common_tag}', f'/api/prompts?category={category}']:
+        link = client.get(url).headers['Link']
+        next_url = re.search(r'<([^>]+)>; rel="next"', link).group(1)
+        assert_index_plan(listing_plans(app, client, next_url), next_url)
+
+def test_rare_tag_sorts_only_its_own_rows(catalog):
+    # The one listing with a sort step: walking the date index for a rare tag
+    # would pass most of the catalog, so its few rows are looked up through
+    # the tag index and sorted instead (see main.tag_filter)
+    app, category, common_tag, rare_tag = catalog
+    url = f'/?tag={rare_tag}'
+    for statement, details in listing_plans(app, app.test_client(), url):
+        assert not any(FULL_SCAN.match(detail) for detail in details), details
+        assert any(detail.startswith('SEARCH prompt_tags USING COVERING INDEX ix_prompt_tags_tag_prompt')
+                   for detail in details), details
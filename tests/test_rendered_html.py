@@ -0,0 +1,30 @@
+from sqlalchemy import insert
+from tests.conftest import admin_client
+
+def test_concurrent_first_render_uses_the_stored_row(make_catalog):
+    from app import db
+    from app.models import Prompt, PromptRender
+    from app.routes.main import get_rendered_html, MARKDOWN_RENDER_VERSION
+
+    app = make_catalog(5)
+    with app.app_context():
+        prompt = db.session.get(Prompt, 1)
+        assert prompt.rendered is None
+
+        # Another worker renders the same prompt between our read and our commit
+        with db.engine.begin() as connection:
+            connection.execute(insert(PromptRender.__table__).values(
+                prompt_id=1, content_html='<p>theirs</p>', version=MARKDOWN_RENDER_VERSION
+            ))
+
+        rendered = get_rendered_html(prompt)
+        assert rendered.content_html == '<p>theirs</p>'
+
+def test_first_view_stores_html(make_catalog):
+    from app import db
+    from app.models import PromptRender
+
+    app = make_catalog(5)
+    assert admin_client(app).get('/prompt/2').status_code == 200
+    with app.app_context():
+        assert db.session.get(PromptRender, 2) is not None
@@ -0,0 +1,18 @@
+import time
+from app.utils.response_cache import SQLiteBackend
+
+def test_sqlite_hits_only_write_once_the_read_time_is_stale(tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / 'cache.db'), max_bytes=1024 * 1024)
+    backend.set('page', b'<html>', ttl=300)
+    connection = backend._connect()
+    writes = connection.total_changes
+
+    for _ in range(10):
+        assert backend.get('page') == b'<html>'
+    assert connection.total_changes == writes
+
+    later = time.time() + SQLiteBackend.TOUCH_AFTER + 1
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert backend.get('page') == b'<html>'
+    assert connection.total_changes == writes + 1
+    assert connection.execute("SELECT accessed_at FROM response_cache").fetchone()[0] == later
@@ -0,0 +1,26 @@
+import pytest
+
+@pytest.fixture
+def app(make_catalog):
+    return make_catalog(60, SEARCH_ENGINE='memory', SEARCH_MAX_RESULTS=5)
+
+@pytest.mark.parametrize('sort_by', ['newest', 'rating', 'popular'])
+def test_other_sorts_cover_every_match(app, sort_by):
+    from app.routes.main import get_filtered_prompts
+    from app.utils.search_index import ensure_search_index
+
+    with app.test_request_context():
+        matches = len(ensure_search_index().search('the', limit=None))
+        page = get_filtered_prompts(search_query='the', sort_by=sort_by, with_facets=True)
+        assert matches > 5
+        assert page.facets['total'] == matches
+
+def test_relevance_keeps_the_best_matches(app):
+    from app.routes.main import get_filtered_prompts
+    from app.utils.search_index import ensure_search_index
+
+    with app.test_request_context():
+        best = [prompt_id for prompt_id, _ in ensure_search_index().search('the', limit=5)]
+        page = get_filtered_prompts(search_query='the', sort_by='relevance', with_facets=True)
+        assert page.facets['total'] == 5
+        assert [prompt.id for prompt in page.items] == best
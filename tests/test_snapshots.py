@@ -0,0 +1,38 @@
+import contextlib
+import io
+import threading
+import pytest
+
+@pytest.fixture(params=['filter_index', 'search_index'])
+def module(request):
+    from app.utils import filter_index, search_index
+    return {'filter_index': filter_index, 'search_index': search_index}[request.param]
+
+def test_another_workers_write_reloads_in_the_background(make_catalog, monkeypatch, module):
+    from app.utils.versions import get_version, CATALOG_VERSION
+    from benchmarks.generate import generate_prompts
+
+    app = make_catalog(40)
+    snapshot = module.snapshot
+    with app.app_context():
+        assert len(snapshot.get()) == 40
+
+    # Another worker adds prompts; this process only sees the version bump
+    with app.app_context(), contextlib.redirect_stderr(io.StringIO()):
+        generate_prompts(5, seed=7)
+
+    load = snapshot.load
+    loaded_on = []
+    def recording_load(version):
+        loaded_on.append(threading.current_thread())
+        load(version)
+    monkeypatch.setattr(snapshot, 'load', recording_load)
+
+    with app.app_context():
+        snapshot.get()
+    snapshot.wait(10)
+
+    assert loaded_on and threading.current_thread() not in loaded_on
+    with app.app_context():
+        assert snapshot.index.version == get_version(CATALOG_VERSION)
+        assert len(snapshot.get()) == 45